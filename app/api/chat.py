@@ -1,35 +1,37 @@
 from __future__ import annotations
+import asyncio
 import uuid
-from typing import Iterator
+from typing import Any, AsyncIterator, Dict
 import json
 
 from fastapi import APIRouter, Query
 from fastapi.responses import StreamingResponse
 
 from ..services.conversation_repository import (
-    append_message,
-    ensure_conversation,
-    get_last_user_message,
-    get_messages,
-    set_conversation_stopped,
-    get_conversation_state,
-    set_conversation_state,
+    aappend_message,
+    aensure_conversation,
+    aget_last_user_message,
+    aget_messages,
+    aset_conversation_stopped,
+    aget_conversation_state,
+    aset_conversation_state,
 )
-from ..chatbot.graph import process_message
+from ..chatbot.graph import aprocess_message
+from ..chatbot.streaming import token_sink
 
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
 
 @router.post("/messages")
-def post_message(payload: dict) -> dict:
+async def post_message(payload: dict) -> dict:
     content = (payload or {}).get("content") or ""
     if not isinstance(content, str) or not content.strip():
         return {"error": "content is required"}
     conv_id = (payload or {}).get("conversation_id") or str(uuid.uuid4())
-    ensure_conversation(conv_id)
+    await aensure_conversation(conv_id)
     msg_id = str(uuid.uuid4())
-    append_message(conv_id, msg_id, "user", content)
+    await aappend_message(conv_id, msg_id, "user", content)
     return {
         "conversation_id": conv_id,
         "message_id": msg_id,
@@ -37,8 +39,29 @@ def post_message(payload: dict) -> dict:
     }
 
 
-def _stream_assistant(conv_id: str) -> Iterator[bytes]:
-    user_msg = get_last_user_message(conv_id)
+async def _run_with_deltas(**kwargs: Any) -> AsyncIterator[Any]:
+    """Run ``aprocess_message`` as a task, yielding answer chunks as they arrive and the result last."""
+    chunks: "asyncio.Queue[str]" = asyncio.Queue()
+    with token_sink(chunks.put_nowait):
+        # The task copies the current context, sink included
+        task = asyncio.create_task(aprocess_message(**kwargs))
+    try:
+        while not task.done() or not chunks.empty():
+            getter = asyncio.ensure_future(chunks.get())
+            await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result()
+            else:
+                getter.cancel()
+        yield task.result()
+    finally:
+        # Client went away mid-stream: stop the graph run
+        if not task.done():
+            task.cancel()
+
+
+async def _stream_assistant(conv_id: str) -> AsyncIterator[bytes]:
+    user_msg = await aget_last_user_message(conv_id)
     if not user_msg:
         yield (json.dumps({"event": "error", "message": "No conversation or message found"}) + "\n").encode("utf-8")
         return
@@ -46,10 +69,10 @@ def _stream_assistant(conv_id: str) -> Iterator[bytes]:
     yield (json.dumps({"event": "start", "conversation_id": conv_id}) + "\n").encode("utf-8")
     try:
         # Load previous state if any
-        prev_state = get_conversation_state(conv_id) or {}
+        prev_state = await aget_conversation_state(conv_id) or {}
         # Also construct rolling history from stored messages (last 4)
         try:
-            msgs = get_messages(conv_id)
+            msgs = await aget_messages(conv_id)
             history = [
                 {"role": m.get("role", "user"), "content": m.get("content", "")}
                 for m in msgs if m.get("content") is not None
@@ -65,46 +88,53 @@ def _stream_assistant(conv_id: str) -> Iterator[bytes]:
             # Non-fatal if history cannot be built
             pass
 
-        result = process_message(
+        # Answer tokens go out as `delta` events; the full `message` still follows
+        result: Dict[str, Any] = {}
+        async for item in _run_with_deltas(
             user_message=str(user_msg.get("content") or ""),
             previous_state=prev_state if isinstance(prev_state, dict) else None,
-        )
+            conversation_id=conv_id,
+        ):
+            if isinstance(item, str):
+                yield (json.dumps({"event": "delta", "role": "assistant", "content": item}) + "\n").encode("utf-8")
+            else:
+                result = item
         text = result.get("response") or ""
         yield (json.dumps({"event": "message", "role": "assistant", "content": text}) + "\n").encode("utf-8")
         if text:
             assistant_id = str(uuid.uuid4())
-            append_message(conv_id, assistant_id, "assistant", text)
+            await aappend_message(conv_id, assistant_id, "assistant", text)
         # Persist updated state for future turns
         state_out = result.get("state")
         if isinstance(state_out, dict):
-            set_conversation_state(conv_id, state_out)
+            await aset_conversation_state(conv_id, state_out)
         yield (json.dumps({"event": "done"}) + "\n").encode("utf-8")
     except Exception as e:
         yield (json.dumps({"event": "error", "message": str(e)}) + "\n").encode("utf-8")
 
 
 @router.get("/stream/{conversation_id}")
-def stream(conversation_id: str):
+async def stream(conversation_id: str):
     return StreamingResponse(_stream_assistant(conversation_id), media_type="application/x-ndjson")
 
 
 @router.get("/messages")
-def list_conversation_messages(conversation_id: str = Query(...)) -> dict:
-    msgs = get_messages(conversation_id)
+async def list_conversation_messages(conversation_id: str = Query(...)) -> dict:
+    msgs = await aget_messages(conversation_id)
     return {"messages": msgs}
 
 
 @router.post("/stop")
-def stop_stream(conversation_id: str):
-    set_conversation_stopped(conversation_id, True)
+async def stop_stream(conversation_id: str):
+    await aset_conversation_stopped(conversation_id, True)
     return {"stopped": True}
 
 
 @router.get("/state")
-def get_state(conversation_id: str = Query(...), include_messages: bool = Query(False)) -> dict:
+async def get_state(conversation_id: str = Query(...), include_messages: bool = Query(False)) -> dict:
     """Debug: Inspect persisted conversation state (and optionally messages)."""
-    state = get_conversation_state(conversation_id) or {}
+    state = await aget_conversation_state(conversation_id) or {}
     data: dict = {"conversation_id": conversation_id, "state": state}
     if include_messages:
-        data["messages"] = get_messages(conversation_id)
+        data["messages"] = await aget_messages(conversation_id)
     return data
@@ -1,6 +1,10 @@
 from __future__ import annotations
 from fastapi import APIRouter
 
+from ..chatbot import intent_rules, preference_rules
+from ..services import http_client, route_planner
+from ..services.trip_suggestions import get_cache_stats
+
 router = APIRouter(prefix="/api/health", tags=["health"])
 
 
@@ -8,3 +12,14 @@ router = APIRouter(prefix="/api/health", tags=["health"])
 def health() -> dict:
     return {"ok": True}
 
+
+@router.get("/stats")
+def stats() -> dict:
+    """Debug: outbound HTTP connection pool, cache, route optimizer and chat rule metrics."""
+    return {
+        "http": http_client.get_stats(),
+        "cache": get_cache_stats(),
+        "route": route_planner.get_stats(),
+        "intent": intent_rules.get_stats(),
+        "preferences": preference_rules.get_stats(),
+    }
@@ -1,12 +1,16 @@
 from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableLambda
 from langchain_google_genai import ChatGoogleGenerativeAI
 import os
-from .nodes.summary_node import summary_node
-from .nodes.intent import intent_node
-from .nodes.preference import preference_node
-from .nodes.itinerary_node import itinerary_node
-from .nodes.small_talk import small_talk_node
-from .nodes.clarification import clarification_node
+import zlib
+from ..core.config import settings
+from .nodes.fused import afused_node, fused_node
+from .nodes.summary_node import asummary_node, summary_node
+from .nodes.intent import aintent_node, intent_node
+from .nodes.preference import apreference_node, preference_node
+from .nodes.itinerary_node import aitinerary_node, itinerary_node
+from .nodes.small_talk import asmall_talk_node, small_talk_node
+from .nodes.clarification import aclarification_node, clarification_node
 from .state import TripState
 
 # Initialize Gemini LLM using langchain_google_genai
@@ -38,6 +42,25 @@ def safe_node_wrapper(node_func, node_name):
             return state
     return wrapper
 
+def safe_async_node_wrapper(anode_func, node_name):
+    """Async counterpart of ``safe_node_wrapper``"""
+    async def wrapper(state):
+        try:
+            return await anode_func(state, llm)
+        except Exception as e:
+            print(f"Error in {node_name}: {str(e)}")
+            state["answer"] = f"I encountered an error while processing. Please try again."
+            return state
+    return wrapper
+
+def graph_node(node_func, anode_func, node_name):
+    """Node that runs ``node_func`` under invoke() and ``anode_func`` under ainvoke()/astream()"""
+    return RunnableLambda(
+        safe_node_wrapper(node_func, node_name),
+        afunc=safe_async_node_wrapper(anode_func, node_name),
+        name=node_name,
+    )
+
 # Create the graph
 graph = StateGraph(TripState)
 
@@ -48,13 +71,14 @@ NODE_SMALL_TALK = "node_small_talk"
 NODE_PREFERENCES = "node_preferences"
 NODE_CLARIFICATION = "node_clarification"
 NODE_ITINERARY = "node_itinerary"
+NODE_FUSED = "node_fused"
 
-graph.add_node(NODE_SUMMARY, safe_node_wrapper(summary_node, NODE_SUMMARY))
-graph.add_node(NODE_INTENT, safe_node_wrapper(intent_node, NODE_INTENT))
-graph.add_node(NODE_SMALL_TALK, safe_node_wrapper(small_talk_node, NODE_SMALL_TALK))
-graph.add_node(NODE_PREFERENCES, safe_node_wrapper(preference_node, NODE_PREFERENCES))
-graph.add_node(NODE_CLARIFICATION, safe_node_wrapper(clarification_node, NODE_CLARIFICATION))
-graph.add_node(NODE_ITINERARY, safe_node_wrapper(itinerary_node, NODE_ITINERARY))
+graph.add_node(NODE_SUMMARY, graph_node(summary_node, asummary_node, NODE_SUMMARY))
+graph.add_node(NODE_INTENT, graph_node(intent_node, aintent_node, NODE_INTENT))
+graph.add_node(NODE_SMALL_TALK, graph_node(small_talk_node, asmall_talk_node, NODE_SMALL_TALK))
+graph.add_node(NODE_PREFERENCES, graph_node(preference_node, apreference_node, NODE_PREFERENCES))
+graph.add_node(NODE_CLARIFICATION, graph_node(clarification_node, aclarification_node, NODE_CLARIFICATION))
+graph.add_node(NODE_ITINERARY, graph_node(itinerary_node, aitinerary_node, NODE_ITINERARY))
 
 # Set entry point
 graph.set_entry_point(NODE_SUMMARY)
@@ -104,62 +128,121 @@ except Exception as e:
     print(f"Error compiling graph: {e}")
     raise
 
-def process_message(user_message: str, previous_state: dict = None) -> dict:
+# Fused variant: one structured call replaces summary -> intent -> preferences
+fused_graph = StateGraph(TripState)
+fused_graph.add_node(NODE_FUSED, graph_node(fused_node, afused_node, NODE_FUSED))
+fused_graph.add_node(NODE_SMALL_TALK, graph_node(small_talk_node, asmall_talk_node, NODE_SMALL_TALK))
+fused_graph.add_node(NODE_CLARIFICATION, graph_node(clarification_node, aclarification_node, NODE_CLARIFICATION))
+fused_graph.add_node(NODE_ITINERARY, graph_node(itinerary_node, aitinerary_node, NODE_ITINERARY))
+fused_graph.set_entry_point(NODE_FUSED)
+
+def route_fused(state: TripState):
+    if (state.get("intent") or "").lower() == "small_talk":
+        return NODE_SMALL_TALK
+    return NODE_CLARIFICATION
+
+fused_graph.add_conditional_edges(NODE_FUSED, route_fused)
+fused_graph.add_conditional_edges(NODE_CLARIFICATION, route_clarification)
+fused_graph.add_edge(NODE_SMALL_TALK, END)
+fused_graph.add_edge(NODE_ITINERARY, END)
+
+try:
+    fused_app = fused_graph.compile()
+except Exception as e:
+    print(f"Error compiling fused graph: {e}")
+    raise
+
+GRAPH_MODES = ("chain", "fused")
+
+
+def select_graph_mode(conversation_id: str = None) -> str:
+    """Graph variant for a conversation per CHAT_GRAPH_MODE; "ab" splits conversations by a stable hash."""
+    mode = (settings.chat_graph_mode or "chain").strip().lower()
+    if mode == "ab":
+        if not conversation_id:
+            return "chain"
+        return GRAPH_MODES[zlib.crc32(conversation_id.encode("utf-8")) % 2]
+    return mode if mode in GRAPH_MODES else "chain"
+
+def _initial_state(user_message: str, previous_state: dict = None) -> TripState:
+    if previous_state:
+        # Convert dict to TripState and update with new message
+        state = TripState(**previous_state)
+        state["query"] = user_message
+    else:
+        # Create new state for first message
+        state = TripState()
+        state["query"] = user_message
+        state["summary"] = ""
+        state["history"] = []
+        state["preferences"] = {}
+        state["missing_fields"] = []
+        state["itinerary_done"] = False
+        state["trip_plan"] = None
+    return state
+
+def _response(result, mode: str) -> dict:
+    # Convert result to serializable dict for API response
+    response_state = {
+        "summary": result.get("summary", ""),
+        "history": result.get("history", []),
+        "query": result.get("query", ""),
+        "intent": result.get("intent"),
+        "preferences": result.get("preferences", {}),
+        "missing_fields": result.get("missing_fields", []),
+        "answer": result.get("answer"),
+        "itinerary_done": result.get("itinerary_done", False),
+        "final_output": result.get("final_output"),
+        "trip_plan": result.get("trip_plan"),
+        "graph_mode": mode,
+    }
+
+    return {
+        "success": True,
+        "response": result.get("answer", "I'm processing your request..."),
+        "state": response_state
+    }
+
+def _error_response(e: Exception, previous_state: dict = None) -> dict:
+    print(f"Error processing message: {str(e)}")
+    return {
+        "success": False,
+        "response": "I encountered an error while processing your message. Please try again.",
+        "state": previous_state or {},
+        "error": str(e)
+    }
+
+def process_message(user_message: str, previous_state: dict = None, conversation_id: str = None) -> dict:
     """
     Process a user message with optional previous state for API usage.
     
     Args:
         user_message: The current user message
         previous_state: Dictionary containing previous conversation state (optional)
+        conversation_id: Used to pick the graph variant when CHAT_GRAPH_MODE=ab (optional)
     
     Returns:
         Dictionary containing updated state and response
     """
     try:
-        # Create or update state
-        if previous_state:
-            # Convert dict to TripState and update with new message
-            state = TripState(**previous_state)
-            state["query"] = user_message
-        else:
-            # Create new state for first message
-            state = TripState()
-            state["query"] = user_message
-            state["summary"] = ""
-            state["history"] = []
-            state["preferences"] = {}
-            state["missing_fields"] = []
-            state["itinerary_done"] = False
-            state["trip_plan"] = None
+        state = _initial_state(user_message, previous_state)
         
         # Run the graph
-        result = app.invoke(state)
-        
-        # Convert result to serializable dict for API response
-        response_state = {
-            "summary": result.get("summary", ""),
-            "history": result.get("history", []),
-            "query": result.get("query", ""),
-            "intent": result.get("intent"),
-            "preferences": result.get("preferences", {}),
-            "missing_fields": result.get("missing_fields", []),
-            "answer": result.get("answer"),
-            "itinerary_done": result.get("itinerary_done", False),
-            "final_output": result.get("final_output"),
-            "trip_plan": result.get("trip_plan")
-        }
-        
-        return {
-            "success": True,
-            "response": result.get("answer", "I'm processing your request..."),
-            "state": response_state
-        }
+        mode = select_graph_mode(conversation_id)
+        state["graph_mode"] = mode
+        result = (fused_app if mode == "fused" else app).invoke(state)
+        return _response(result, mode)
         
     except Exception as e:
-        print(f"Error processing message: {str(e)}")
-        return {
-            "success": False,
-            "response": "I encountered an error while processing your message. Please try again.",
-            "state": previous_state or {},
-            "error": str(e)
-        }
+        return _error_response(e, previous_state)
+
+async def aprocess_message(user_message: str, previous_state: dict = None, conversation_id: str = None) -> dict:
+    """Async ``process_message``: runs the graph with ainvoke so LLM calls don't hold a thread."""
+    try:
+        state = _initial_state(user_message, previous_state)
+        mode = select_graph_mode(conversation_id)
+        state["graph_mode"] = mode
+        result = await (fused_app if mode == "fused" else app).ainvoke(state)
+        return _response(result, mode)
+    except Exception as e:
+        return _error_response(e, previous_state)
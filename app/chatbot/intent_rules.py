@@ -0,0 +1,134 @@
+"""Local intent classification ahead of the LLM.
+
+Whole-message small talk ("hi", "thanks!", "how are you") is recognised by a
+regex. Trip planning is scored from independent signals: a known place from
+the offline gazetteer, a duration ("5 days"), travel words, a budget, a date
+or a trip type, plus a bonus while preferences are still being collected (a
+bare "3 days" answers the clarifying question). Outside that exchange a
+destination, duration or date must be present, and while collecting an
+acknowledgement ("ok", "great") is not taken as small talk. ``rule_intent`` returns a
+label only when the score clears the configured threshold; anything else is
+left to the model.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from ..services.cache_keys import normalize_text
+from ..services.gazetteer import COMMON_WORD_KEYS, get_gazetteer
+from .nodes.preference import _ALLOWED_TRIP_TYPES
+
+
+_SMALL_TALK_PHRASE = (
+    r"(?:hi|hii+|hello|hey|heya|hiya|yo|namaste|hola|greetings|good (?:morning|afternoon|evening|night|day)"
+    r"|there|sunny|again|thanks?|thank you|thx|ty|cheers|so much|a lot|bye|goodbye|see you(?: later)?"
+    r"|ok|okay|cool|great|nice|awesome|lol|haha|how are you(?: doing)?|how s it going|what s up|sup"
+    r"|who are you|what is your name|what s your name|are you a bot|you re (?:great|awesome|helpful))"
+)
+_SMALL_TALK_RE = re.compile(rf"^{_SMALL_TALK_PHRASE}(?: {_SMALL_TALK_PHRASE})*$")
+
+_NUMBER_WORDS = r"(?:\d{1,3}|a|an|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|fourteen|fifteen)"
+_DURATION_RE = re.compile(rf"\b{_NUMBER_WORDS}[ -]?(?:days?|nights?|weeks?)\b|\b(?:weekend|fortnight)\b")
+_BUDGET_RE = re.compile(
+    r"[₹$€£¥]\s?\d|\b\d[\d,.]*\s?(?:k|l|lakh|lakhs|rs|inr|usd|eur|gbp|rupees|dollars|euros)\b"
+    r"|\b(?:rs|inr|usd|eur|gbp)\.?\s?\d|\bbudget\b",
+    re.IGNORECASE,
+)
+_DATE_RE = re.compile(
+    r"\b\d{4}-\d{2}-\d{2}\b|\b\d{1,2}[/-]\d{1,2}(?:[/-]\d{2,4})?\b"
+    r"|\b(?:january|february|march|april|june|july|august|september|october|november|december"
+    r"|jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec)\b"
+    # "may" is also a verb, so it only counts next to a day number
+    r"|\bmay \d{1,2}\b|\b\d{1,2}(?:st|nd|rd|th)?(?: of)? may\b"
+    r"|\b(?:next|this) (?:week|month|weekend|year)\b|\btomorrow\b|\bflexible\b",
+    re.IGNORECASE,
+)
+_TRAVEL_WORDS = {
+    "trip", "travel", "travelling", "traveling", "itinerary", "vacation", "holiday", "holidays", "visit",
+    "visiting", "tour", "getaway", "honeymoon", "sightseeing", "destination", "destinations", "flight",
+    "flights", "hotel", "hotels", "stay", "backpacking", "trek", "trekking", "explore", "plan", "planning",
+}
+_TRIP_TYPE_WORDS = {
+    word
+    for label in _ALLOWED_TRIP_TYPES
+    for word in normalize_text(label).split()
+    if word not in {"and", "event"}
+}
+# Replies that acknowledge a clarifying question rather than chat ("ok", "great")
+_ACKNOWLEDGEMENTS = {"ok", "okay", "cool", "great", "nice", "awesome"}
+_WEIGHTS = {
+    "place": 0.6,
+    "duration": 0.5,
+    "travel": 0.5,
+    "travel_extra": 0.3,
+    "budget": 0.4,
+    "date": 0.3,
+    "trip_type": 0.3,
+    "collecting": 0.5,
+}
+_SMALL_TALK_CONFIDENCE = 0.95
+# Travel words alone ("thanks for the plan, I'll stay tuned") stay below any sensible threshold
+_UNANCHORED_CAP = 0.5
+
+_STATS: Dict[str, int] = {"rule_trip_planning": 0, "rule_small_talk": 0, "llm": 0}
+_LOCK = threading.Lock()
+
+
+def classify_intent(query: str, *, collecting: bool = False) -> Tuple[Optional[str], float]:
+    """(label, confidence) from local rules; label is None when nothing matched."""
+    text = normalize_text(query)
+    if not text:
+        return None, 0.0
+    words = set(text.split())
+    if _SMALL_TALK_RE.match(text):
+        if collecting and words & _ACKNOWLEDGEMENTS:
+            return None, 0.0
+        return "small_talk", _SMALL_TALK_CONFIDENCE
+
+    score = 0.0
+    places = [p for p in get_gazetteer().mentions(text) if p not in COMMON_WORD_KEYS]
+    if places:
+        score += _WEIGHTS["place"]
+    has_duration = bool(_DURATION_RE.search(text))
+    if has_duration:
+        score += _WEIGHTS["duration"]
+    travel_hits = len(words & _TRAVEL_WORDS)
+    if travel_hits:
+        score += _WEIGHTS["travel"] + (_WEIGHTS["travel_extra"] if travel_hits > 1 else 0.0)
+    if _BUDGET_RE.search(query or ""):
+        score += _WEIGHTS["budget"]
+    has_date = bool(_DATE_RE.search(text))
+    if has_date:
+        score += _WEIGHTS["date"]
+    if words & _TRIP_TYPE_WORDS:
+        score += _WEIGHTS["trip_type"]
+    if not score:
+        return None, 0.0
+    if collecting:
+        score += _WEIGHTS["collecting"]
+    elif not (places or has_duration or has_date):
+        # Outside a clarifying exchange, only a destination, duration or date makes it a trip request
+        score = min(score, _UNANCHORED_CAP)
+    return "trip_planning", min(1.0, round(score, 2))
+
+
+def rule_intent(state: Dict[str, Any], threshold: float) -> Optional[str]:
+    """Intent for this turn when the rules are confident enough, else None (ask the LLM)."""
+    collecting = bool(state.get("preferences")) and bool(state.get("missing_fields"))
+    label, confidence = classify_intent(state.get("query", ""), collecting=collecting)
+    decided = label if label is not None and confidence >= threshold else None
+    with _LOCK:
+        _STATS[f"rule_{decided}" if decided else "llm"] += 1
+    return decided
+
+
+def get_stats() -> Dict[str, Any]:
+    """How many turns the rules decided versus sent to the LLM."""
+    with _LOCK:
+        stats: Dict[str, Any] = dict(_STATS)
+    total = sum(stats.values())
+    stats["rule_rate"] = round((total - stats["llm"]) / total, 3) if total else None
+    return stats
@@ -1,7 +1,7 @@
 import json
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
-from ..utils import get_text
+from ..streaming import astream_text, stream_text
 
 
 _ORDERED_FIELDS: List[Tuple[str, str]] = [
@@ -13,9 +13,8 @@ _ORDERED_FIELDS: List[Tuple[str, str]] = [
 ]
 
 
-def clarification_node(state, llm):
-    """Ask for up to 3 missing preferences in a conversational way."""
-
+def _clarification_prompt(state) -> Optional[str]:
+    """Record the missing fields; the question prompt, or None when nothing is missing."""
     prefs = state.get("preferences", {}) or {}
     summary = state.get("summary", "")
     query = state.get("query", "")
@@ -27,7 +26,7 @@ def clarification_node(state, llm):
 
     if not missing_fields:
         state["answer"] = None
-        return state
+        return None
 
     recent_turns = []
     for item in history[-4:]:
@@ -36,7 +35,7 @@ def clarification_node(state, llm):
         recent_turns.append(f"{role}: {content}")
     recent_context = "\n".join(recent_turns) if recent_turns else "None"
 
-    prompt = f"""
+    return f"""
 You are Sunny, a cheerful and empathetic travel-planning assistant.
 
 Context you can rely on:
@@ -69,15 +68,40 @@ When asking about trip type, include examples like "Adventure or Leisure" or "Cu
 Craft a natural response that asks for the most logical 1-3 missing details now.
 """
 
+
+def _apply_clarification(state, answer: str):
+    state["answer"] = answer.strip()
+    if not state["answer"]:
+        raise ValueError("Empty clarification response")
+    return state
+
+
+def _clarification_fallback(state):
+    # Fallback to asking for the first missing field
+    missing_labels = state.get("missing_fields") or []
+    first_missing = missing_labels[0] if missing_labels else "details"
+    state["answer"] = f"Could you share your {first_missing} so I can keep tailoring the plan?"
+    return state
+
+
+def clarification_node(state, llm):
+    """Ask for up to 3 missing preferences in a conversational way."""
+    prompt = _clarification_prompt(state)
+    if prompt is None:
+        return state
     try:
-        response = llm.invoke(prompt)
-        state["answer"] = get_text(response).strip()
-        if not state["answer"]:
-            raise ValueError("Empty clarification response")
+        return _apply_clarification(state, stream_text(llm, prompt))
     except Exception as exc:
         print(f"Error in clarification node: {exc}")
-        # Fallback to asking for the first missing field
-        first_missing = missing_labels[0] if missing_labels else "details"
-        state["answer"] = f"Could you share your {first_missing} so I can keep tailoring the plan?"
+        return _clarification_fallback(state)
+
 
-    return state
\ No newline at end of file
+async def aclarification_node(state, llm):
+    prompt = _clarification_prompt(state)
+    if prompt is None:
+        return state
+    try:
+        return _apply_clarification(state, await astream_text(llm, prompt))
+    except Exception as exc:
+        print(f"Error in clarification node: {exc}")
+        return _clarification_fallback(state)
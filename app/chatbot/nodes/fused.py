@@ -0,0 +1,116 @@
+import json
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from ..utils import get_text
+from .preference import (
+    _ALLOWED_TRIP_TYPES,
+    _extract_json_object,
+    _normalise_result,
+    apply_preferences,
+    rule_preferences,
+)
+from .summary_node import remember_user_message
+
+
+class TripPreferences(BaseModel):
+    location: Optional[str] = Field(None, description="Destination city/region/country")
+    trip_type: Optional[List[str]] = Field(None, description="Labels from the allowed trip types")
+    num_days: Optional[int] = Field(None, description="Whole number of days")
+    trip_start_day: Optional[str] = Field(None, description='YYYY-MM-DD, or "flexible"')
+    budget: Optional[str] = Field(None, description="Currency + amount, e.g. INR 20000")
+
+
+class FusedTurn(BaseModel):
+    summary: str = Field(description="Updated running summary of the conversation")
+    intent: Literal["trip_planning", "small_talk"]
+    preferences: TripPreferences
+
+
+def _fused_prompt(state) -> str:
+    formatted_history = remember_user_message(state)
+    return f"""
+You are the understanding step of a friendly travel-planning assistant. In one pass,
+update the conversation summary, classify the user's intent and extract trip preferences.
+
+Summary rules:
+- Only include information that the user has actually provided.
+- If the user changes a detail (e.g., new destination, new budget), update the summary and remove the old one.
+- Keep it concise and factual, including relevant small talk context.
+
+Intent rules:
+- trip_planning: the user is asking about or trying to plan a trip (destinations, dates, preferences, activities, itinerary, budget, travel advice).
+- small_talk: greetings, thanks or casual chatter unrelated to trip planning.
+
+Preference rules:
+- location: destination city/region/country; trip_type: labels from {json.dumps(_ALLOWED_TRIP_TYPES)};
+  num_days: integer; trip_start_day: YYYY-MM-DD or "flexible"; budget: currency + amount.
+- Copy stored values the user did not change; apply new details or corrections from the current message.
+- Use null for anything still unknown.
+
+Stored preference snapshot:
+{json.dumps(state.get("preferences") or {}, indent=2, ensure_ascii=False)}
+
+Previous summary:
+{state.get("summary", "")}
+
+Conversation history (last 4 messages):
+{formatted_history}
+
+Current user message:
+{state.get("query", "")}
+
+Return JSON with keys: summary, intent, preferences (location, trip_type, num_days, trip_start_day, budget).
+"""
+
+
+def _as_dict(result: Any) -> Dict[str, Any]:
+    if isinstance(result, BaseModel):
+        return result.model_dump()
+    if isinstance(result, dict):
+        return result
+    return _extract_json_object(get_text(result))
+
+
+def _apply_fused(state, parsed: Dict[str, Any]):
+    summary = parsed.get("summary")
+    if isinstance(summary, str) and summary.strip():
+        state["summary"] = summary.strip()
+    intent = str(parsed.get("intent") or "").strip().lower()
+    # Default to trip_planning if unclear, as intent_node does
+    state["intent"] = intent if intent in ("trip_planning", "small_talk") else "trip_planning"
+    prefs = _normalise_result(parsed.get("preferences") or {})
+    # Rule matches only override the model when they account for the whole message
+    found, explained = rule_preferences(state)
+    return apply_preferences(state, {**prefs, **found} if explained else prefs)
+
+
+def fused_node(state, llm):
+    """Summary, intent and preferences from a single schema-constrained model call."""
+    prompt = _fused_prompt(state)
+    try:
+        parsed = _as_dict(llm.with_structured_output(FusedTurn).invoke(prompt))
+    except Exception as exc:
+        # Structured output unsupported or rejected; retry once as plain JSON text
+        print(f"Structured fused call failed, falling back to JSON text: {exc}")
+        try:
+            parsed = _extract_json_object(get_text(llm.invoke(prompt)))
+        except Exception as exc2:
+            print(f"Error in fused understanding call: {exc2}")
+            parsed = {}
+    return _apply_fused(state, parsed)
+
+
+async def afused_node(state, llm):
+    prompt = _fused_prompt(state)
+    try:
+        parsed = _as_dict(await llm.with_structured_output(FusedTurn).ainvoke(prompt))
+    except Exception as exc:
+        print(f"Structured fused call failed, falling back to JSON text: {exc}")
+        try:
+            parsed = _extract_json_object(get_text(await llm.ainvoke(prompt)))
+        except Exception as exc2:
+            print(f"Error in fused understanding call: {exc2}")
+            parsed = {}
+    return _apply_fused(state, parsed)
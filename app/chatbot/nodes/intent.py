@@ -1,10 +1,13 @@
-def intent_node(state, llm):
-    """Classify user intent as trip planning or small talk"""
-    
+from ...core.config import settings
+from ..intent_rules import rule_intent
+from ..utils import get_text
+
+
+def _intent_prompt(state) -> str:
     summary = state.get("summary", "")
     query = state.get("query", "")
 
-    prompt = f"""
+    return f"""
 You are an intent classification assistant for a travel chatbot.
 
 Your job:
@@ -37,21 +40,37 @@ Current user message:
 Answer with exactly one label: `trip_planning` or `small_talk`
 """
 
+
+def _apply_intent(state, text: str):
+    intent = text.strip().lower()
+    # Validate the response; default to trip_planning if unclear
+    state["intent"] = intent if intent in ["trip_planning", "small_talk"] else "trip_planning"
+    return state
+
+
+def intent_node(state, llm):
+    """Classify user intent as trip planning or small talk"""
+    intent = rule_intent(state, settings.intent_rule_threshold)
+    if intent:
+        state["intent"] = intent
+        return state
     try:
-        res = llm.invoke(prompt)
-        intent = get_text(res).strip().lower()
-        
-        # Validate the response
-        if intent in ["trip_planning", "small_talk"]:
-            state["intent"] = intent
-        else:
-            # Default to trip_planning if unclear
-            state["intent"] = "trip_planning"
-            
+        return _apply_intent(state, get_text(llm.invoke(_intent_prompt(state))))
     except Exception as e:
         print(f"Error in intent classification: {e}")
         # Default to trip_planning on error
         state["intent"] = "trip_planning"
-    
     return state
-from ..utils import get_text
+
+
+async def aintent_node(state, llm):
+    intent = rule_intent(state, settings.intent_rule_threshold)
+    if intent:
+        state["intent"] = intent
+        return state
+    try:
+        return _apply_intent(state, get_text(await llm.ainvoke(_intent_prompt(state))))
+    except Exception as e:
+        print(f"Error in intent classification: {e}")
+        state["intent"] = "trip_planning"
+    return state
@@ -1,11 +1,14 @@
+import asyncio
 import json
 import re
-from ..utils import get_text
+from typing import Any, Dict, Optional
+
+from ..streaming import astream_text, stream_text
 from ...services.trip_suggestions import get_trip_plan_suggestions
 
-def itinerary_node(state, llm):
-    """Generate trip itinerary based on collected preferences"""
-    
+
+def _itinerary_request(state) -> Optional[Dict[str, Any]]:
+    """Normalised planning inputs, or None (with a prompt for the gaps) when details are missing."""
     # Extract preferences from state
     preferences = state.get("preferences", {})
     location = preferences.get("location")
@@ -28,7 +31,7 @@ def itinerary_node(state, llm):
             "I’m almost ready to generate your itinerary. "
             f"I still need: {', '.join(missing_labels)}."
         )
-        return state
+        return None
 
     # Normalize/parse values
     try:
@@ -62,46 +65,62 @@ def itinerary_node(state, llm):
         # Non-fatal normalization errors
         budget_value = None
 
-    # Call trip suggestion service for a structured plan
-    try:
-        resp = get_trip_plan_suggestions(
-            location=location,
-            no_of_days_to_stay=int(num_days),
-            trip_type=str(trip_type),
-            budget=budget_value,
-            language="en",
-            region="IN",
-        )
+    return {
+        "preferences": preferences,
+        "location": location,
+        "num_days": num_days,
+        "trip_type": trip_type,
+        "budget": budget,
+        "budget_value": budget_value,
+        "trip_start_day": trip_start_day,
+    }
 
-        # Store raw plan for frontend consumption
-        state["trip_plan"] = resp
-
-        # Compose a concise answer for chat
-        trip_days = resp.get("trip_plan") or []
-        stay_plan = resp.get("stay_plan") or []
-        intro = f"I’ve prepared a {num_days}-day {trip_type.lower()} plan for {location}."
-        day1_preview = ""
-        if trip_days:
-            first_day = trip_days[0]
-            locs = first_day.get("locations") or []
-            if locs:
-                names = ", ".join([l.get("name", "") for l in locs[:3] if l.get("name")])
-                if names:
-                    day1_preview = f" Day 1 highlights: {names}."
-        stays_preview = f" I also included {len(stay_plan)} stay options." if stay_plan else ""
-
-        state["answer"] = (intro + day1_preview + stays_preview).strip()
-        state["itinerary_done"] = True
-        state["final_output"] = {
-            "preferences": preferences,
-            "generated_at": trip_start_day or "flexible",
-            "trip_plan": resp,
-        }
 
-    except Exception as e:
-        # Fallback to LLM text itinerary if service fails for any reason
-        print(f"Error generating structured trip plan: {e}")
-        prompt = f"""
+def _suggestion_kwargs(req: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "location": req["location"],
+        "no_of_days_to_stay": int(req["num_days"]),
+        "trip_type": str(req["trip_type"]),
+        "budget": req["budget_value"],
+        "language": "en",
+        "region": "IN",
+    }
+
+
+def _apply_trip_plan(state, req: Dict[str, Any], resp: Dict[str, Any]):
+    location, num_days, trip_type = req["location"], req["num_days"], req["trip_type"]
+
+    # Store raw plan for frontend consumption
+    state["trip_plan"] = resp
+
+    # Compose a concise answer for chat
+    trip_days = resp.get("trip_plan") or []
+    stay_plan = resp.get("stay_plan") or []
+    intro = f"I’ve prepared a {num_days}-day {trip_type.lower()} plan for {location}."
+    day1_preview = ""
+    if trip_days:
+        first_day = trip_days[0]
+        locs = first_day.get("locations") or []
+        if locs:
+            names = ", ".join([l.get("name", "") for l in locs[:3] if l.get("name")])
+            if names:
+                day1_preview = f" Day 1 highlights: {names}."
+    stays_preview = f" I also included {len(stay_plan)} stay options." if stay_plan else ""
+
+    state["answer"] = (intro + day1_preview + stays_preview).strip()
+    state["itinerary_done"] = True
+    state["final_output"] = {
+        "preferences": req["preferences"],
+        "generated_at": req["trip_start_day"] or "flexible",
+        "trip_plan": resp,
+    }
+    return state
+
+
+def _fallback_prompt(req: Dict[str, Any]) -> str:
+    location, num_days, trip_type = req["location"], req["num_days"], req["trip_type"]
+    budget, trip_start_day = req["budget"], req["trip_start_day"]
+    return f"""
 You are an expert travel planner creating a detailed itinerary.
 
 Trip Details:
@@ -121,21 +140,61 @@ Create a day-by-day itinerary that includes:
 
 Format as a clear, easy-to-read itinerary. Be enthusiastic and helpful!
 """
+
+
+def _apply_fallback_text(state, req: Dict[str, Any], itinerary_text: str):
+    state["answer"] = itinerary_text
+    state["itinerary_done"] = True
+    state["final_output"] = {
+        "itinerary": itinerary_text,
+        "preferences": req["preferences"],
+        "generated_at": req["trip_start_day"] or "flexible",
+    }
+    return state
+
+
+_UNAVAILABLE_ANSWER = (
+    "I'm having trouble generating your itinerary right now. "
+    "Could you confirm your destination and trip duration?"
+)
+
+
+def itinerary_node(state, llm):
+    """Generate trip itinerary based on collected preferences"""
+    req = _itinerary_request(state)
+    if req is None:
+        return state
+
+    # Call trip suggestion service for a structured plan
+    try:
+        return _apply_trip_plan(state, req, get_trip_plan_suggestions(**_suggestion_kwargs(req)))
+    except Exception as e:
+        # Fallback to LLM text itinerary if service fails for any reason
+        print(f"Error generating structured trip plan: {e}")
         try:
-            res = llm.invoke(prompt)
-            itinerary_text = get_text(res).strip()
-            state["answer"] = itinerary_text
-            state["itinerary_done"] = True
-            state["final_output"] = {
-                "itinerary": itinerary_text,
-                "preferences": preferences,
-                "generated_at": trip_start_day or "flexible",
-            }
+            _apply_fallback_text(state, req, stream_text(llm, _fallback_prompt(req)).strip())
         except Exception as ee:
             print(f"Error generating fallback itinerary: {ee}")
-            state["answer"] = (
-                "I'm having trouble generating your itinerary right now. "
-                "Could you confirm your destination and trip duration?"
-            )
-    
+            state["answer"] = _UNAVAILABLE_ANSWER
+
+    return state
+
+
+async def aitinerary_node(state, llm):
+    """Async ``itinerary_node``; the blocking planner runs in a worker thread."""
+    req = _itinerary_request(state)
+    if req is None:
+        return state
+
+    try:
+        resp = await asyncio.to_thread(get_trip_plan_suggestions, **_suggestion_kwargs(req))
+        return _apply_trip_plan(state, req, resp)
+    except Exception as e:
+        print(f"Error generating structured trip plan: {e}")
+        try:
+            _apply_fallback_text(state, req, (await astream_text(llm, _fallback_prompt(req))).strip())
+        except Exception as ee:
+            print(f"Error generating fallback itinerary: {ee}")
+            state["answer"] = _UNAVAILABLE_ANSWER
+
     return state
@@ -1,6 +1,7 @@
 import json
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
+from ..preference_rules import extract_preferences, record
 from ..utils import get_text
 
 
@@ -114,12 +115,12 @@ def _normalise_result(raw: Dict[str, Any]) -> Dict[str, Any]:
     return output
 
 
-def preference_node(state, llm):
+def _preference_prompt(state) -> str:
     summary = state.get("summary", "")
     query = state.get("query", "")
     current_prefs = state.get("preferences", {}) or {}
 
-    prompt = f"""
+    return f"""
 You manage preference gathering for a friendly travel-planning assistant.
 
 Goal: read the conversation and output the up-to-date trip preferences using this schema:
@@ -151,16 +152,56 @@ Current user message:
 Return a JSON object with exactly these keys: location, trip_type, num_days, trip_start_day, budget.
 """
 
+
+def rule_preferences(state) -> Tuple[Dict[str, Any], bool]:
+    """Preferences the local rules find in this message, and whether they explain all of it."""
+    prefs = state.get("preferences") or {}
+    missing = [key for key in _EXPECTED_KEYS if not prefs.get(key)]
+    return extract_preferences(state.get("query", ""), missing)
+
+
+def _rules_explain(state) -> bool:
+    """Apply the rule matches when they explain the whole message; otherwise leave it all to the model."""
+    found, explained = rule_preferences(state)
+    record(explained)
+    if explained:
+        apply_preferences(state, found)
+    return explained
+
+
+def _merge_response(state, raw_response: str):
+    parsed = _extract_json_object(raw_response)
+    return apply_preferences(state, _normalise_result(parsed))
+
+
+def preference_node(state, llm):
+    if _rules_explain(state):
+        return state
+    try:
+        raw_response = get_text(llm.invoke(_preference_prompt(state)))
+    except Exception as exc:
+        print(f"Error calling preference LLM: {exc}")
+        state["missing_fields"] = list(_EXPECTED_KEYS.keys())
+        return state
+
+    return _merge_response(state, raw_response)
+
+
+async def apreference_node(state, llm):
+    if _rules_explain(state):
+        return state
     try:
-        raw_response = get_text(llm.invoke(prompt))
+        raw_response = get_text(await llm.ainvoke(_preference_prompt(state)))
     except Exception as exc:
         print(f"Error calling preference LLM: {exc}")
         state["missing_fields"] = list(_EXPECTED_KEYS.keys())
         return state
 
-    parsed = _extract_json_object(raw_response)
-    new_prefs = _normalise_result(parsed)
+    return _merge_response(state, raw_response)
+
 
+def apply_preferences(state, new_prefs: Dict[str, Any]):
+    """Merge non-null extracted values into the stored preferences and recompute missing fields."""
     prefs = state.get("preferences")
     if not isinstance(prefs, dict):
         prefs = {}
@@ -1,10 +1,11 @@
-def small_talk_node(state, llm):
-    """Handle small talk and casual conversation while gently steering toward travel"""
-    
+from ..streaming import astream_text, stream_text
+
+
+def _small_talk_prompt(state) -> str:
     summary = state.get("summary", "")
     query = state.get("query", "")
 
-    prompt = f"""
+    return f"""
 You are a friendly, enthusiastic travel planning assistant having a casual conversation.
 
 Your personality:
@@ -28,20 +29,34 @@ User message: "{query}"
 Respond naturally and warmly, keeping it brief and steering toward travel when appropriate:
 """
 
+
+def _small_talk_fallback(query: str) -> str:
+    """Canned replies based on common patterns, for when the model call fails."""
+    query_lower = (query or "").lower()
+    if any(greeting in query_lower for greeting in ["hi", "hello", "hey"]):
+        return "Hello! I'm here to help you plan an amazing trip. Where are you thinking of traveling?"
+    elif "how are you" in query_lower:
+        return "I'm doing great, thank you! I love helping people discover new places. Are you planning any trips?"
+    elif any(thanks in query_lower for thanks in ["thank", "thanks"]):
+        return "You're very welcome! Let me know if you'd like help planning your next adventure."
+    else:
+        return "That's interesting! Speaking of interesting places, are you planning any trips I could help you with?"
+
+
+def small_talk_node(state, llm):
+    """Handle small talk and casual conversation while gently steering toward travel"""
+    try:
+        state["answer"] = stream_text(llm, _small_talk_prompt(state)).strip()
+    except Exception as e:
+        print(f"Error in small talk node: {e}")
+        state["answer"] = _small_talk_fallback(state.get("query", ""))
+    return state
+
+
+async def asmall_talk_node(state, llm):
     try:
-        res = llm.invoke(prompt)
-        state["answer"] = res.content.strip()
+        state["answer"] = (await astream_text(llm, _small_talk_prompt(state))).strip()
     except Exception as e:
         print(f"Error in small talk node: {e}")
-        # Fallback responses based on common patterns
-        query_lower = query.lower()
-        if any(greeting in query_lower for greeting in ["hi", "hello", "hey"]):
-            state["answer"] = "Hello! I'm here to help you plan an amazing trip. Where are you thinking of traveling?"
-        elif "how are you" in query_lower:
-            state["answer"] = "I'm doing great, thank you! I love helping people discover new places. Are you planning any trips?"
-        elif any(thanks in query_lower for thanks in ["thank", "thanks"]):
-            state["answer"] = "You're very welcome! Let me know if you'd like help planning your next adventure."
-        else:
-            state["answer"] = "That's interesting! Speaking of interesting places, are you planning any trips I could help you with?"
-    
-    return state
\ No newline at end of file
+        state["answer"] = _small_talk_fallback(state.get("query", ""))
+    return state
@@ -1,7 +1,7 @@
 
-def summary_node(state, llm):
+def remember_user_message(state) -> str:
+    """Append the current query to the rolling history (last 4) and return it formatted."""
     query = state.get("query", "")
-    summary = state.get("summary", "")
     history = state.get("history") or []
 
     # Ensure history is a list and add current message
@@ -14,11 +14,17 @@ def summary_node(state, llm):
             history = history[-4:]
         state["history"] = history
 
-    formatted_history = "\n".join(
+    return "\n".join(
         [f"{(msg.get('role') or 'user').capitalize()}: {msg.get('content', '')}" for msg in history]
     )
 
-    prompt = f"""
+
+def _summary_prompt(state) -> str:
+    query = state.get("query", "")
+    summary = state.get("summary", "")
+    formatted_history = remember_user_message(state)
+
+    return f"""
 You are maintaining a running summary of a trip planning conversation.
 
 Rules:
@@ -40,7 +46,15 @@ Conversation history (last 4 messages):
 Return an updated summary in plain text.
 """
 
-    res = llm.invoke(prompt)
+
+def summary_node(state, llm):
+    res = llm.invoke(_summary_prompt(state))
+    state["summary"] = get_text(res)
+    return state
+
+
+async def asummary_node(state, llm):
+    res = await llm.ainvoke(_summary_prompt(state))
     state["summary"] = get_text(res)
     return state
 from ..utils import get_text
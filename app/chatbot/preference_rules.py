@@ -0,0 +1,306 @@
+"""Deterministic preference extraction ahead of the LLM.
+
+Regexes pick out the number of days, a budget with its currency, an ISO or
+relative start date (or "flexible"), trip type labels and, through the
+offline gazetteer, an unambiguous destination. Each match blanks its span;
+if what is left is only filler words ("for", "my budget is", "please"), the
+message is fully explained and the preference LLM call can be skipped.
+"""
+
+from __future__ import annotations
+
+import calendar
+import re
+import threading
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..services.cache_keys import normalize_text
+from ..services.gazetteer import COMMON_WORD_KEYS, get_gazetteer
+
+
+_NUMBERS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+    "fifteen": 15, "twenty": 20, "thirty": 30,
+}
+_NUMBER = r"(\d{1,3}|" + "|".join(sorted(_NUMBERS, key=len, reverse=True)) + r")"
+
+_MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+_MONTHS["sept"] = 9
+# "may" is also a verb ("may 5 people join?"), so it gets its own stricter patterns below
+_MONTH = r"(" + "|".join(sorted((m for m in _MONTHS if m != "may"), key=len, reverse=True)) + r")\.?"
+_WEEKDAYS = {name.lower(): i for i, name in enumerate(calendar.day_name)}
+_WEEKDAY = r"(" + "|".join(_WEEKDAYS) + r")"
+
+_ISO_DATE_RE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_DAY_MONTH_RE = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?(?: of)? {_MONTH}(?:,? (\d{{4}}))?\b")
+# "may 5 days" is a duration, not the 5th of May
+_MONTH_DAY_RE = re.compile(
+    rf"\b{_MONTH} (\d{{1,2}})(?:st|nd|rd|th)?(?:,? (\d{{4}}))?\b(?! ?(?:days?|nights?|weeks?)\b)"
+)
+_DAY_MAY_RE = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th|(?= of))(?: of)? (may)(?:,? (\d{4}))?\b")
+_MAY_ORDINAL_RE = re.compile(r"\b(may) (\d{1,2})(?:st|nd|rd|th)(?:,? (\d{4}))?\b")
+_MAY_AFTER_PREP_RE = re.compile(
+    r"\b(?:on|from|by|starting|start) (may) (\d{1,2})(?:,? (\d{4}))?\b(?! ?(?:days?|nights?|weeks?)\b)"
+)
+_MAY_YEAR_RE = re.compile(r"\b(may) (\d{1,2}),? (\d{4})\b")
+# (pattern, day group, month group); the year is always group 3
+_DATE_PATTERNS = (
+    (_DAY_MONTH_RE, 0, 1),
+    (_DAY_MAY_RE, 0, 1),
+    (_MONTH_DAY_RE, 1, 0),
+    (_MAY_ORDINAL_RE, 1, 0),
+    (_MAY_AFTER_PREP_RE, 1, 0),
+    (_MAY_YEAR_RE, 1, 0),
+)
+_IN_PERIOD_RE = re.compile(rf"\bin {_NUMBER} (days?|weeks?)\b")
+_NEXT_WEEKDAY_RE = re.compile(rf"\b(?:next|this|on|coming) {_WEEKDAY}\b")
+_RELATIVE_RE = re.compile(
+    r"\b(day after tomorrow|tomorrow|today|next weekend|this weekend|next week|next month|early next month)\b"
+)
+# "flexible" alone could be about the budget; only read it next to a date word
+_FLEXIBLE_RE = re.compile(
+    r"\b(?:dates?|start(?:ing)?(?: date)?|when|timing)(?: (?:is|are|can be|will be|quite|pretty|totally|very|fairly))*"
+    r" (?:flexible|flexi)\b"
+    r"|\b(?:flexible|flexi) (?:on |with |about )?(?:the )?(?:dates?|start(?:ing)?(?: date)?|timing|when)\b"
+    r"|\b(?:any ?time|whenever|no fixed dates?)\b"
+)
+_BARE_FLEXIBLE_RE = re.compile(r"\s*(?:i ?m |i am |we re |we are )?(?:quite |pretty |totally |fairly )?(?:flexible|flexi)\s*")
+
+_DURATION_RE = re.compile(rf"\b{_NUMBER}[ -]?(days?|nights?|weeks?)\b|\b(a )?(fortnight|weekend|week)\b")
+
+_SYMBOLS = {"₹": "INR", "$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY"}
+_CODES = {
+    "inr": "INR", "rs": "INR", "rupees": "INR", "rupee": "INR", "usd": "USD", "dollars": "USD",
+    "eur": "EUR", "euros": "EUR", "gbp": "GBP", "pounds": "GBP", "aed": "AED", "sgd": "SGD", "jpy": "JPY",
+}
+_MULTIPLIERS = {"k": 1_000, "thousand": 1_000, "l": 100_000, "lakh": 100_000, "lakhs": 100_000, "lac": 100_000}
+_AMOUNT = r"(\d[\d,]*(?:\.\d+)?)\s?(k|thousand|lakhs?|lac|l)?\b"
+_CODE = r"(" + "|".join(sorted(_CODES, key=len, reverse=True)) + r")\.?"
+_BUDGET_PATTERNS = [
+    re.compile(r"([₹$€£¥])\s?" + _AMOUNT),
+    re.compile(rf"\b{_CODE}\s?" + _AMOUNT),
+    re.compile(r"\b" + _AMOUNT + rf"\s?{_CODE}\b"),
+    re.compile(r"\bbudget(?: is| of| around| about| under| upto| up to)?\s?" + _AMOUNT),
+]
+
+_TRIP_TYPE_SYNONYMS = {
+    "Adventure": ["adventure", "adventurous"],
+    "Leisure": ["leisure", "relaxing", "relaxed", "chill"],
+    "Business": ["business", "work trip"],
+    "Wellness": ["wellness", "spa", "yoga", "retreat"],
+    "Cultural": ["cultural", "culture", "heritage", "historical", "history"],
+    "Romantic": ["romantic", "honeymoon"],
+    "Family": ["family", "with kids", "with my kids"],
+    "Solo": ["solo", "alone"],
+    "Friends/Group": ["friends", "group"],
+    "Luxury": ["luxury", "luxurious"],
+    "Budget/Backpacking": ["backpacking", "backpacker", "budget trip", "budget travel", "budget backpacking"],
+    "Eco/Nature": ["eco", "nature", "wildlife"],
+    "Spiritual/Pilgrimage": ["spiritual", "pilgrimage", "temples"],
+    "Food & Wine": ["food", "foodie", "culinary", "wine", "food & wine", "food and wine"],
+    "Festival/Event": ["festival", "event", "concert"],
+}
+_TRIP_TYPE_RES = [
+    (label, re.compile(r"\b(" + "|".join(re.escape(s) for s in sorted(synonyms, key=len, reverse=True)) + r")\b"))
+    for label, synonyms in _TRIP_TYPE_SYNONYMS.items()
+]
+
+# Words that carry no preference on their own; a message made only of these and
+# extracted spans is fully explained. "per person" / "for 4 people" change what a
+# budget means, so they are not filler and such messages go to the model.
+_FILLER = set(
+    """
+    i im we my our me us the a an is are am it its s be would will like want wanna prefer preferably
+    please pls ok okay sure yes yeah yep let lets make say maybe probably around about approx
+    approximately roughly max maximum upto up under within and with plus also for of to in on at
+    from this that so then just only total trip travel travelling traveling vacation holiday tour
+    visit stay staying budget start starting date dates day days duration type kind go going plan
+    planning need have got hi hey thanks thank you there can could should keep
+    fine good great perfect type style something
+    """.split()
+)
+
+_STATS: Dict[str, int] = {"rule_only": 0, "with_llm": 0}
+_LOCK = threading.Lock()
+
+
+def _number(token: str) -> int:
+    return int(token) if token.isdigit() else _NUMBERS[token]
+
+
+def _blank(text: str, match: "re.Match[str]") -> str:
+    return text[: match.start()] + " " * (match.end() - match.start()) + text[match.end() :]
+
+
+def _future_date(today: date, month: int, day: int, year: Optional[str]) -> Optional[date]:
+    try:
+        if year:
+            return date(int(year), month, day)
+        candidate = date(today.year, month, day)
+        return candidate if candidate >= today else date(today.year + 1, month, day)
+    except ValueError:
+        return None
+
+
+def _extract_budget(text: str) -> Tuple[Optional[str], str]:
+    for pattern in _BUDGET_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        groups = list(match.groups())
+        currency = None
+        if groups[0] in _SYMBOLS:
+            currency, groups = _SYMBOLS[groups[0]], groups[1:]
+        elif groups[0] and groups[0].rstrip(".") in _CODES:
+            currency, groups = _CODES[groups[0].rstrip(".")], groups[1:]
+        elif len(groups) == 3 and groups[2]:
+            currency = _CODES[groups[2].rstrip(".")]
+        amount_text, unit = groups[0], groups[1]
+        try:
+            amount = float(amount_text.replace(",", "")) * _MULTIPLIERS.get(unit or "", 1)
+        except ValueError:
+            continue
+        if amount <= 0:
+            continue
+        amount_str = f"{amount:.0f}" if amount == int(amount) else f"{amount:.2f}"
+        return (f"{currency} {amount_str}" if currency else amount_str), _blank(text, match)
+    return None, text
+
+
+def _extract_start(text: str, today: date) -> Tuple[Optional[str], str]:
+    match = _FLEXIBLE_RE.search(text)
+    if match:
+        return "flexible", _blank(text, match)
+    match = _ISO_DATE_RE.search(text)
+    if match:
+        try:
+            return date(*map(int, match.groups())).isoformat(), _blank(text, match)
+        except ValueError:
+            pass
+    for pattern, day_idx, month_idx in _DATE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            groups = match.groups()
+            found = _future_date(today, _MONTHS[groups[month_idx]], int(groups[day_idx]), groups[2])
+            if found:
+                return found.isoformat(), _blank(text, match)
+    match = _IN_PERIOD_RE.search(text)
+    if match:
+        n = _number(match.group(1))
+        days = n * 7 if match.group(2).startswith("week") else n
+        return (today + timedelta(days=days)).isoformat(), _blank(text, match)
+    match = _NEXT_WEEKDAY_RE.search(text)
+    if match:
+        ahead = (_WEEKDAYS[match.group(1)] - today.weekday()) % 7 or 7
+        return (today + timedelta(days=ahead)).isoformat(), _blank(text, match)
+    match = _RELATIVE_RE.search(text)
+    if match:
+        phrase = match.group(1)
+        saturday = today + timedelta(days=(5 - today.weekday()) % 7)
+        first_next_month = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+        found = {
+            "today": today,
+            "tomorrow": today + timedelta(days=1),
+            "day after tomorrow": today + timedelta(days=2),
+            "this weekend": saturday,
+            "next weekend": saturday + timedelta(days=7) if saturday - today < timedelta(days=2) else saturday,
+            "next week": today + timedelta(days=7 - today.weekday()),
+            "next month": first_next_month,
+            "early next month": first_next_month,
+        }[phrase]
+        return found.isoformat(), _blank(text, match)
+    return None, text
+
+
+def _extract_days(text: str) -> Tuple[Optional[int], str]:
+    # The last duration is the one that stands: "not 5 days, make it 3 days"
+    matches = list(_DURATION_RE.finditer(text))
+    if not matches:
+        return None, text
+    match = matches[-1]
+    if match.group(1):
+        n, unit = _number(match.group(1)), match.group(2)
+        days = n * 7 if unit.startswith("week") else n
+    else:
+        days = {"fortnight": 14, "weekend": 2, "week": 7}[match.group(4)]
+    return (days if 0 < days <= 90 else None), _blank(text, match)
+
+
+def _extract_trip_types(text: str) -> Tuple[Optional[List[str]], str]:
+    found: List[Tuple[int, str]] = []
+    for label, pattern in _TRIP_TYPE_RES:
+        match = pattern.search(text)
+        if match:
+            found.append((match.start(), label))
+            text = pattern.sub(lambda m: " " * len(m.group(0)), text)
+    return ([label for _, label in sorted(found)] or None), text
+
+
+def _extract_location(text: str) -> Tuple[Optional[str], str]:
+    gazetteer = get_gazetteer()
+    places = [p for p in gazetteer.mentions(text) if p not in COMMON_WORD_KEYS]
+    # "from Mumbai" is where they leave from, not the destination
+    if len(places) != 1 or re.search(rf"\bfrom {re.escape(places[0])}\b", normalize_text(text)):
+        return None, text
+    row = gazetteer.lookup(places[0])
+    if row is None:
+        return None, text
+    return row["name"], " ".join(w for w in normalize_text(text).split() if w not in places[0].split())
+
+
+def extract_preferences(
+    query: str,
+    missing_fields: Optional[List[str]] = None,
+    *,
+    today: Optional[date] = None,
+) -> Tuple[Dict[str, Any], bool]:
+    """(preferences found by the rules, whether they explain the whole message)."""
+    today = today or date.today()
+    text = (query or "").lower()
+    prefs: Dict[str, Any] = {}
+
+    budget, text = _extract_budget(text)
+    # Start dates first so "in 3 days" is not read as a duration
+    start, text = _extract_start(text, today)
+    num_days, text = _extract_days(text)
+    trip_types, text = _extract_trip_types(text)
+    location, text = _extract_location(text)
+
+    # A bare number answers the question we asked, when only one numeric field is open
+    missing = set(missing_fields or [])
+    bare = re.fullmatch(r"\s*(\d{1,3})\s*", text)
+    if bare and num_days is None and "num_days" in missing and "budget" not in missing:
+        num_days, text = int(bare.group(1)), ""
+    # Likewise a bare "flexible" answers the start-date question, unless the budget is also open
+    if _BARE_FLEXIBLE_RE.fullmatch(text) and start is None and "trip_start_day" in missing and "budget" not in missing:
+        start, text = "flexible", ""
+
+    for key, value in (
+        ("location", location),
+        ("trip_type", trip_types),
+        ("num_days", num_days),
+        ("trip_start_day", start),
+        ("budget", budget),
+    ):
+        if value is not None:
+            prefs[key] = value
+
+    leftover = [w for w in normalize_text(text).split() if w not in _FILLER]
+    return prefs, bool(prefs) and not leftover
+
+
+def record(rule_only: bool) -> None:
+    with _LOCK:
+        _STATS["rule_only" if rule_only else "with_llm"] += 1
+
+
+def get_stats() -> Dict[str, Any]:
+    """How many preference turns were fully explained by the rules."""
+    with _LOCK:
+        stats: Dict[str, Any] = dict(_STATS)
+    total = stats["rule_only"] + stats["with_llm"]
+    stats["rule_rate"] = round(stats["rule_only"] / total, 3) if total else None
+    return stats
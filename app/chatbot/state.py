@@ -12,6 +12,7 @@ class TripState(MessagesState):
     itinerary_done: bool = False
     final_output: Optional[Dict[str, Any]] = None
     trip_plan: Optional[Dict[str, Any]] = None  # For storing raw trip plan data
+    graph_mode: Optional[str] = None  # "chain" or "fused", whichever graph produced this state
     
     def __init__(self, **data):
         """Initialize state with proper defaults"""
@@ -26,7 +27,8 @@ class TripState(MessagesState):
             "answer": None,
             "itinerary_done": False,
             "final_output": None,
-            "trip_plan": None
+            "trip_plan": None,
+            "graph_mode": None,
         }
         
         # Merge defaults with provided data
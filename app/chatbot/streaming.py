@@ -0,0 +1,64 @@
+"""Forward answer tokens from graph nodes to whoever is serving the reply.
+
+The API sets a token sink for the duration of one graph run; answering nodes
+call ``stream_text`` instead of ``llm.invoke`` so each chunk reaches the sink
+as soon as the model produces it. Without a sink (tests, scripts, the
+understanding nodes) it is a plain ``invoke``.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List, Optional
+
+from .utils import get_text
+
+
+_TOKEN_SINK: ContextVar[Optional[Callable[[str], None]]] = ContextVar("chat_token_sink", default=None)
+
+
+@contextmanager
+def token_sink(sink: Callable[[str], None]) -> Iterator[None]:
+    """Deliver streamed answer chunks to ``sink`` within this block."""
+    token = _TOKEN_SINK.set(sink)
+    try:
+        yield
+    finally:
+        _TOKEN_SINK.reset(token)
+
+
+def _forward(sink: Callable[[str], None], parts: List[str], chunk: Any) -> None:
+    text = get_text(chunk)
+    # Leading whitespace is stripped from the final answer; keep deltas consistent with it
+    if not parts:
+        text = text.lstrip()
+    if not text:
+        return
+    parts.append(text)
+    try:
+        sink(text)
+    except Exception as e:
+        print(f"Token sink failed: {e}")
+
+
+def stream_text(llm: Any, prompt: Any) -> str:
+    """Full response text of ``llm`` for ``prompt``, streaming chunks to the active sink if any."""
+    sink = _TOKEN_SINK.get()
+    if sink is None:
+        return get_text(llm.invoke(prompt))
+    parts: List[str] = []
+    for chunk in llm.stream(prompt):
+        _forward(sink, parts, chunk)
+    return "".join(parts)
+
+
+async def astream_text(llm: Any, prompt: Any) -> str:
+    """Async ``stream_text`` using ``llm.astream``/``llm.ainvoke``."""
+    sink = _TOKEN_SINK.get()
+    if sink is None:
+        return get_text(await llm.ainvoke(prompt))
+    parts: List[str] = []
+    async for chunk in llm.astream(prompt):
+        _forward(sink, parts, chunk)
+    return "".join(parts)
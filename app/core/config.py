@@ -1,3 +1,5 @@
+import os
+
 from pydantic import BaseModel
 
 
@@ -8,6 +10,10 @@ class Settings(BaseModel):
     cors_allow_origins: list[str] = ["*"]
     cors_allow_methods: list[str] = ["*"]
     cors_allow_headers: list[str] = ["*"]
+    # "chain" (summary -> intent -> preferences), "fused" (one call) or "ab" (split by conversation id)
+    chat_graph_mode: str = os.getenv("CHAT_GRAPH_MODE", "chain")
+    # Local intent rules answer when at least this confident; otherwise the LLM decides (above 1 = always LLM)
+    intent_rule_threshold: float = float(os.getenv("CHAT_INTENT_RULE_THRESHOLD", "0.8"))
 
 
 settings = Settings()
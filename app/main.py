@@ -13,6 +13,8 @@ load_dotenv()
 from .core.config import settings
 from .api.health import router as health_router
 from .api.chat import router as chat_router
+from .services import http_client
+from .services.mongo import amongo_available
 app = FastAPI(title=settings.app_name)
 
 # Serve built frontend (Vite) if available
@@ -35,6 +37,17 @@ app.include_router(health_router)
 app.include_router(chat_router)
 
 
+@app.on_event("startup")
+async def connect_mongo():
+    # Resolve the Mongo connectivity check once, off the event loop, before serving requests
+    await amongo_available()
+
+
+@app.on_event("shutdown")
+def close_http_sessions():
+    http_client.close()
+
+
 @app.get("/")
 def root():
     if INDEX_HTML.exists():
@@ -0,0 +1,511 @@
+"""In-process cache and pluggable shared tiers used by the trip planning services."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+
+def _estimate_size(value: Any) -> int:
+    """Rough in-memory footprint of a JSON-like value, in bytes."""
+    try:
+        return len(json.dumps(value, default=str, ensure_ascii=False).encode("utf-8"))
+    except Exception:
+        return 1024
+
+
+class CachedLookupError(RuntimeError):
+    """Raised when a recent upstream failure for the same key is still negatively cached."""
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one execution.
+
+    The first caller runs ``fn``; callers arriving while it is in flight wait
+    and receive the same result (or exception).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = {"executed": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._stats["executed"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls)}
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "stale_until", "size", "negative", "error")
+
+    def __init__(
+        self,
+        value: Any,
+        expires_at: float,
+        stale_until: float,
+        size: int,
+        negative: bool = False,
+        error: Optional[str] = None,
+    ) -> None:
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.size = size
+        self.negative = negative
+        self.error = error
+
+
+class CacheBackend:
+    """A slower, shared or persistent tier layered under ``LRUCache``.
+
+    Implementations must never raise: failures are logged and reported as a
+    miss so the in-process cache keeps working on its own.
+    """
+
+    name = "backend"
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, expires_at epoch seconds) or None."""
+        return None
+
+    def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Tuple[Any, float]]:
+        """Batched ``get``; only hits are returned. Override when the store can do one round trip."""
+        hits = {}
+        for key in keys:
+            hit = self.get(namespace, key)
+            if hit is not None:
+                hits[key] = hit
+        return hits
+
+    def set(self, namespace: str, key: str, value: Any, expires_at: float) -> None:
+        return None
+
+    def increment(
+        self, namespace: str, key: str, deltas: Dict[str, float], expires_at: float
+    ) -> Optional[Dict[str, float]]:
+        """Atomically add ``deltas`` to the numeric fields of a dict value and return the new totals.
+
+        None means the store cannot do this atomically (or failed); ``LRUCache``
+        then falls back to a locked read-modify-write.
+        """
+        return None
+
+    def delete(self, namespace: str, key: str) -> None:
+        return None
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+# Background refreshes for stale-while-revalidate; shared by all caches
+_REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+
+
+class LRUCache:
+    """Thread-safe LRU cache with per-namespace TTLs and entry/byte caps.
+
+    Keys are (namespace, key) pairs. Expired entries are dropped when read and
+    by a periodic sweep on writes; once the cache is over ``max_entries`` or
+    ``max_bytes`` (0 = unlimited) the least recently used entries are evicted.
+
+    Optional ``backends`` are consulted in order on a local miss (read-through,
+    promoting hits into the faster tiers) and receive every write
+    (write-through).
+
+    ``get_or_load`` adds negative caching (empty results and failures are kept
+    locally for ``negative_ttl``), stale-while-revalidate (an expired entry
+    is still served for ``stale_ttl`` while one background refresh runs) and
+    single-flight loading (concurrent misses on a key share one upstream call).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 5000,
+        max_bytes: int = 0,
+        default_ttl: float = 900,
+        namespace_ttls: Optional[Dict[str, float]] = None,
+        sweep_interval: float = 60,
+        backends: Optional[List[CacheBackend]] = None,
+        negative_ttl: float = 60,
+        stale_ttl: float = 0,
+        namespace_stale_ttls: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.namespace_ttls = dict(namespace_ttls or {})
+        self.sweep_interval = sweep_interval
+        self.backends: List[CacheBackend] = list(backends or [])
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.namespace_stale_ttls = dict(namespace_stale_ttls or {})
+        self._data: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._refreshing: Set[Tuple[str, str]] = set()
+        self._increment_lock = threading.Lock()
+        self.flight = SingleFlight()
+
+    def ttl_for(self, namespace: str) -> float:
+        return self.namespace_ttls.get(namespace, self.default_ttl)
+
+    def stale_ttl_for(self, namespace: str) -> float:
+        return self.namespace_stale_ttls.get(namespace, self.stale_ttl)
+
+    def _ns_stats(self, namespace: str) -> Dict[str, int]:
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = {
+                "hits": 0,
+                "misses": 0,
+                "backend_hits": 0,
+                "stale_hits": 0,
+                "negative_hits": 0,
+                "refreshes": 0,
+                "sets": 0,
+                "negative_sets": 0,
+                "evictions": 0,
+                "expirations": 0,
+            }
+            self._stats[namespace] = stats
+        return stats
+
+    def _drop(self, cache_key: Tuple[str, str], reason: str) -> None:
+        entry = self._data.pop(cache_key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        self._ns_stats(cache_key[0])[reason] += 1
+
+    def _lookup_local(self, namespace: str, key: str, now: float) -> Optional[_Entry]:
+        """Return the local entry if still fresh or stale-servable; caller holds the lock."""
+        cache_key = (namespace, key)
+        entry = self._data.get(cache_key)
+        if entry is None:
+            return None
+        if entry.stale_until <= now:
+            self._drop(cache_key, "expirations")
+            return None
+        self._data.move_to_end(cache_key)
+        return entry
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            stats = self._ns_stats(namespace)
+            entry = self._lookup_local(namespace, key, now)
+            if entry is not None and entry.expires_at > now and entry.error is None:
+                stats["negative_hits" if entry.negative else "hits"] += 1
+                return entry.value
+            stats["misses"] += 1
+        return self._get_from_backends(namespace, key)
+
+    def get_shared(self, namespace: str, key: str) -> Optional[Any]:
+        """Read through the backends first so writes from other instances are seen; refreshes the local tier."""
+        value = self._get_from_backends(namespace, key) if self.backends else None
+        return value if value is not None else self.get(namespace, key)
+
+    def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Any]:
+        """Look up many keys at once: one pass over the local tier, then one batch per backend.
+
+        Returns {key: value} for the keys found; missing keys are left out.
+        """
+        now = time.time()
+        found: Dict[str, Any] = {}
+        missing: List[str] = []
+        with self._lock:
+            stats = self._ns_stats(namespace)
+            for key in dict.fromkeys(keys):
+                entry = self._lookup_local(namespace, key, now)
+                if entry is not None and entry.expires_at > now and entry.error is None:
+                    stats["negative_hits" if entry.negative else "hits"] += 1
+                    found[key] = entry.value
+                else:
+                    stats["misses"] += 1
+                    missing.append(key)
+        for idx, backend in enumerate(self.backends):
+            if not missing:
+                break
+            hits = backend.get_many(namespace, missing)
+            now = time.time()
+            for key, (value, expires_at) in hits.items():
+                if expires_at > now:
+                    self._promote(namespace, key, value, expires_at, idx)
+                    found[key] = value
+            missing = [key for key in missing if key not in found]
+        return found
+
+    def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Any],
+        *,
+        is_negative: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Return the cached value or call ``loader`` and cache what it returns.
+
+        Results for which ``is_negative`` is true, and loader exceptions, are
+        cached locally for ``negative_ttl``; a cached failure re-raises as
+        ``CachedLookupError``. Entries past their TTL but within the stale
+        window are returned immediately while a single background refresh
+        reloads them.
+        """
+        now = time.time()
+        with self._lock:
+            stats = self._ns_stats(namespace)
+            entry = self._lookup_local(namespace, key, now)
+            if entry is not None:
+                if entry.expires_at > now:
+                    if entry.error is not None:
+                        stats["negative_hits"] += 1
+                        raise CachedLookupError(entry.error)
+                    stats["negative_hits" if entry.negative else "hits"] += 1
+                    return entry.value
+                if not entry.negative:
+                    stats["stale_hits"] += 1
+                    self._schedule_refresh(namespace, key, loader, is_negative)
+                    return entry.value
+            stats["misses"] += 1
+
+        def _fill() -> Any:
+            value = self._get_from_backends(namespace, key)
+            if value is not None:
+                return value
+            return self._load(namespace, key, loader, is_negative)
+
+        return self.flight.do((namespace, key), _fill)
+
+    def _load(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Any],
+        is_negative: Optional[Callable[[Any], bool]],
+    ) -> Any:
+        try:
+            value = loader()
+        except Exception as e:
+            self.set_negative(namespace, key, error=str(e) or e.__class__.__name__)
+            raise
+        if is_negative is not None and is_negative(value):
+            self.set_negative(namespace, key, value)
+        else:
+            self.set(namespace, key, value)
+        return value
+
+    def _schedule_refresh(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Any],
+        is_negative: Optional[Callable[[Any], bool]],
+    ) -> None:
+        """Start one background reload for a stale key; caller holds the lock."""
+        cache_key = (namespace, key)
+        if cache_key in self._refreshing:
+            return
+        self._refreshing.add(cache_key)
+        self._ns_stats(namespace)["refreshes"] += 1
+
+        def _refresh() -> None:
+            try:
+                value = self.flight.do(cache_key, loader)
+                # Keep serving the stale value rather than replacing it with an empty result
+                if is_negative is None or not is_negative(value):
+                    self.set(namespace, key, value)
+            except Exception as e:
+                logging.warning("Background refresh of %s::%s failed: %s", namespace, key, e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(cache_key)
+
+        _REFRESH_EXECUTOR.submit(_refresh)
+
+    def _get_from_backends(self, namespace: str, key: str) -> Optional[Any]:
+        for idx, backend in enumerate(self.backends):
+            hit = backend.get(namespace, key)
+            if hit is None:
+                continue
+            value, expires_at = hit
+            if expires_at <= time.time():
+                continue
+            self._promote(namespace, key, value, expires_at, idx)
+            return value
+        return None
+
+    def _promote(self, namespace: str, key: str, value: Any, expires_at: float, backend_idx: int) -> None:
+        """Copy a backend hit into the faster tiers with its remaining lifetime."""
+        self._set_local(namespace, key, _Entry(value, expires_at, expires_at + self.stale_ttl_for(namespace), 0))
+        for upper in self.backends[:backend_idx]:
+            upper.set(namespace, key, value, expires_at)
+        with self._lock:
+            self._ns_stats(namespace)["backend_hits"] += 1
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl_for(namespace) if ttl is None else ttl
+        expires_at = time.time() + ttl
+        self._set_local(namespace, key, _Entry(value, expires_at, expires_at + self.stale_ttl_for(namespace), 0))
+        with self._lock:
+            self._ns_stats(namespace)["sets"] += 1
+        for backend in self.backends:
+            backend.set(namespace, key, value, expires_at)
+
+    def increment(
+        self, namespace: str, key: str, deltas: Dict[str, float], ttl: Optional[float] = None
+    ) -> Dict[str, float]:
+        """Add ``deltas`` to a dict of counters and return the new totals.
+
+        The first backend that can increment atomically is the source of truth,
+        so concurrent writers on other instances are not lost; the result is
+        copied into the local tier and the other backends. Without such a
+        backend the update is a read-modify-write serialized in this process.
+        """
+        ttl = self.ttl_for(namespace) if ttl is None else ttl
+        expires_at = time.time() + ttl
+        for idx, backend in enumerate(self.backends):
+            totals = backend.increment(namespace, key, deltas, expires_at)
+            if totals is None:
+                continue
+            self._set_local(namespace, key, _Entry(totals, expires_at, expires_at + self.stale_ttl_for(namespace), 0))
+            with self._lock:
+                self._ns_stats(namespace)["sets"] += 1
+            for other_idx, other in enumerate(self.backends):
+                if other_idx != idx:
+                    other.set(namespace, key, totals, expires_at)
+            return totals
+        with self._increment_lock:
+            current = self.get(namespace, key)
+            totals = dict(current) if isinstance(current, dict) else {}
+            for field, delta in deltas.items():
+                totals[field] = float(totals.get(field, 0.0)) + delta
+            self.set(namespace, key, totals, ttl)
+        return totals
+
+    def set_negative(self, namespace: str, key: str, value: Any = None, *, error: Optional[str] = None) -> None:
+        """Remember an empty result or failure locally (never in shared tiers) for ``negative_ttl``."""
+        expires_at = time.time() + self.negative_ttl
+        self._set_local(namespace, key, _Entry(value, expires_at, expires_at, 0, negative=True, error=error))
+        with self._lock:
+            self._ns_stats(namespace)["negative_sets"] += 1
+
+    def _set_local(self, namespace: str, key: str, entry: _Entry) -> None:
+        cache_key = (namespace, key)
+        entry.size = _estimate_size(entry.value)
+        now = time.time()
+        with self._lock:
+            old = self._data.pop(cache_key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._data[cache_key] = entry
+            self._bytes += entry.size
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep(now)
+            self._evict()
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            entry = self._data.pop((namespace, key), None)
+            if entry is not None:
+                self._bytes -= entry.size
+        for backend in self.backends:
+            backend.delete(namespace, key)
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            if namespace is None:
+                self._data.clear()
+                self._bytes = 0
+            else:
+                for cache_key in [k for k in self._data if k[0] == namespace]:
+                    self._bytes -= self._data.pop(cache_key).size
+        for backend in self.backends:
+            backend.clear(namespace)
+
+    def _sweep(self, now: float) -> None:
+        expired = [k for k, entry in self._data.items() if entry.stale_until <= now]
+        for cache_key in expired:
+            self._drop(cache_key, "expirations")
+        self._last_sweep = now
+
+    def _evict(self) -> None:
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._data))
+            self._drop(oldest, "evictions")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries: Dict[str, int] = {}
+            for namespace, _ in self._data:
+                entries[namespace] = entries.get(namespace, 0) + 1
+            namespaces: Dict[str, Any] = {}
+            for namespace, counters in self._stats.items():
+                served = counters["hits"] + counters["backend_hits"] + counters["stale_hits"] + counters["negative_hits"]
+                # Backend hits are counted as local misses but still avoided an upstream call
+                lookups = counters["hits"] + counters["stale_hits"] + counters["negative_hits"] + counters["misses"]
+                namespaces[namespace] = {
+                    **counters,
+                    "entries": entries.get(namespace, 0),
+                    "hit_rate": round(served / lookups, 3) if lookups else None,
+                    "ttl_seconds": self.ttl_for(namespace),
+                    "stale_ttl_seconds": self.stale_ttl_for(namespace),
+                }
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "negative_ttl_seconds": self.negative_ttl,
+                "single_flight": self.flight.stats(),
+                "namespaces": namespaces,
+                "backends": {backend.name: backend.stats() for backend in self.backends},
+            }
@@ -0,0 +1,73 @@
+"""Cache key normalization and hit-rate accounting for free-text destinations."""
+
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+_NON_WORD_RE = re.compile(r"[^\w\s]+", re.UNICODE)
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Casefold and strip punctuation/extra whitespace: " Goa, India! " -> "goa india"."""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    text = _NON_WORD_RE.sub(" ", text).replace("_", " ")
+    return " ".join(text.split())
+
+
+def alias_variants(location: str, item: Dict[str, Any]) -> List[str]:
+    """Normalized strings that should resolve to the same place as ``item``.
+
+    Covers the user's text, the resolved name, the full formatted address and
+    "<name> <country>" (so "Jaipur, India" matches "Jaipur, Rajasthan, India").
+    """
+    name = item.get("name") or ""
+    address = item.get("formatted_address") or ""
+    parts = [p.strip() for p in address.split(",") if p.strip()]
+    country = item.get("country") or (parts[-1] if len(parts) > 1 else "")
+    candidates: Iterable[str] = (
+        location,
+        name,
+        address,
+        f"{name} {country}" if name and country else "",
+    )
+    return [v for v in dict.fromkeys(normalize_text(c) for c in candidates) if v]
+
+
+class KeyStats:
+    """Counts lookups and how many hits only happened thanks to normalization.
+
+    A hit is "gained" when the raw, un-normalized key had never been seen by
+    this process, i.e. the old raw-string keys would have missed.
+    """
+
+    def __init__(self, max_raw_keys: int = 10000) -> None:
+        self.max_raw_keys = max_raw_keys
+        self._seen_raw: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"lookups": 0, "hits": 0, "raw_key_hits": 0}
+
+    def record(self, raw_key: str, hit: bool) -> None:
+        with self._lock:
+            raw_seen = raw_key in self._seen_raw
+            self._seen_raw[raw_key] = None
+            self._seen_raw.move_to_end(raw_key)
+            while len(self._seen_raw) > self.max_raw_keys:
+                self._seen_raw.popitem(last=False)
+            self._counts["lookups"] += 1
+            if hit:
+                self._counts["hits"] += 1
+                if raw_seen:
+                    self._counts["raw_key_hits"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["lookups"]
+        counts["hits_gained"] = counts["hits"] - counts["raw_key_hits"]
+        counts["hit_rate"] = round(counts["hits"] / lookups, 3) if lookups else None
+        counts["raw_key_hit_rate"] = round(counts["raw_key_hits"] / lookups, 3) if lookups else None
+        return counts
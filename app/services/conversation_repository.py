@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 from pymongo.collection import Collection
 
-from .mongo import get_database
+from .mongo import aget_async_database, amongo_available, get_database
 from . import store as memory_store
 
 
@@ -16,6 +17,28 @@ def _mongo_collections() -> tuple[Optional[Collection], Optional[Collection]]:
     return db["conversations"], db["messages"]
 
 
+def _message_out(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(doc.get("_id")),
+        "role": doc.get("role", "user"),
+        "content": doc.get("content"),
+        "extra": doc.get("extra", {}),
+        "created_at": (doc.get("created_at") or datetime.now(timezone.utc)).isoformat(),
+    }
+
+
+def _last_user_out(conv_id: str, doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not doc:
+        return None
+    return {
+        "id": str(doc.get("_id")),
+        "conversation_id": conv_id,
+        "role": doc.get("role", "user"),
+        "content": doc.get("content", ""),
+        "extra": doc.get("extra", {}),
+    }
+
+
 def get_conversation_state(conv_id: str) -> Optional[Dict[str, Any]]:
     """Return persisted conversation state if available."""
     conv_col, _ = _mongo_collections()
@@ -133,16 +156,7 @@ def get_messages(conv_id: str) -> List[Dict[str, Any]]:
     _, msg_col = _mongo_collections()
     if msg_col is not None:
         docs = msg_col.find({"conversation_id": conv_id}).sort("created_at", 1)
-        return [
-            {
-                "id": str(doc.get("_id")),
-                "role": doc.get("role", "user"),
-                "content": doc.get("content"),
-                "extra": doc.get("extra", {}),
-                "created_at": (doc.get("created_at") or datetime.now(timezone.utc)).isoformat(),
-            }
-            for doc in docs
-        ]
+        return [_message_out(doc) for doc in docs]
 
     convo = memory_store.CONVERSATIONS.get(conv_id)
     if not convo:
@@ -171,15 +185,7 @@ def get_last_user_message(conv_id: str) -> Optional[Dict[str, Any]]:
             {"conversation_id": conv_id, "role": "user"},
             sort=[("created_at", -1)],
         )
-        if doc:
-            return {
-                "id": str(doc.get("_id")),
-                "conversation_id": conv_id,
-                "role": doc.get("role", "user"),
-                "content": doc.get("content", ""),
-                "extra": doc.get("extra", {}),
-            }
-        return None
+        return _last_user_out(conv_id, doc)
 
     convo = memory_store.CONVERSATIONS.get(conv_id)
     if not convo:
@@ -198,3 +204,114 @@ def set_conversation_stopped(conv_id: str, stopped: bool) -> None:
         return
     convo = memory_store.CONVERSATIONS.setdefault(conv_id, {"id": conv_id, "messages": []})
     convo["stopped"] = stopped
+
+
+# Async variants for the async request path. With motor they await Mongo directly;
+# with only pymongo they run the sync call in a worker thread; the in-memory
+# store is non-blocking and is used as is.
+
+
+async def _motor_collections():
+    db = await aget_async_database()
+    if db is None:
+        return None, None
+    return db["conversations"], db["messages"]
+
+
+async def _fallback(func, *args: Any) -> Any:
+    if await amongo_available():
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+
+async def aget_conversation_state(conv_id: str) -> Optional[Dict[str, Any]]:
+    conv_col, _ = await _motor_collections()
+    if conv_col is None:
+        return await _fallback(get_conversation_state, conv_id)
+    doc = await conv_col.find_one({"_id": conv_id}, projection={"state": 1})
+    if not doc:
+        return None
+    return doc.get("state") or None
+
+
+async def aset_conversation_state(conv_id: str, state: Dict[str, Any]) -> None:
+    conv_col, _ = await _motor_collections()
+    if conv_col is None:
+        return await _fallback(set_conversation_state, conv_id, state)
+    timestamp = datetime.now(timezone.utc)
+    await conv_col.update_one(
+        {"_id": conv_id},
+        {
+            "$set": {"state": state, "updated_at": timestamp},
+            "$setOnInsert": {"created_at": timestamp},
+            "$inc": {"message_count": 0},
+        },
+        upsert=True,
+    )
+
+
+async def aensure_conversation(conv_id: str) -> None:
+    conv_col, _ = await _motor_collections()
+    if conv_col is None:
+        return await _fallback(ensure_conversation, conv_id)
+    now = datetime.now(timezone.utc)
+    await conv_col.update_one(
+        {"_id": conv_id},
+        {"$setOnInsert": {"created_at": now, "updated_at": now, "message_count": 0}},
+        upsert=True,
+    )
+
+
+async def aappend_message(
+    conv_id: str,
+    msg_id: str,
+    role: str,
+    content: Any,
+    extra: Optional[Dict[str, Any]] = None,
+) -> None:
+    conv_col, msg_col = await _motor_collections()
+    if conv_col is None or msg_col is None:
+        return await _fallback(append_message, conv_id, msg_id, role, content, extra)
+    timestamp = datetime.now(timezone.utc)
+    await msg_col.insert_one(
+        {
+            "_id": msg_id,
+            "conversation_id": conv_id,
+            "role": role,
+            "content": content,
+            "extra": extra or {},
+            "created_at": timestamp,
+        }
+    )
+    await conv_col.update_one(
+        {"_id": conv_id},
+        {
+            "$set": {"updated_at": timestamp, "last_role": role},
+            "$inc": {"message_count": 1},
+            "$setOnInsert": {"created_at": timestamp},
+        },
+        upsert=True,
+    )
+
+
+async def aget_messages(conv_id: str) -> List[Dict[str, Any]]:
+    _, msg_col = await _motor_collections()
+    if msg_col is None:
+        return await _fallback(get_messages, conv_id)
+    docs = await msg_col.find({"conversation_id": conv_id}).sort("created_at", 1).to_list(length=None)
+    return [_message_out(doc) for doc in docs]
+
+
+async def aget_last_user_message(conv_id: str) -> Optional[Dict[str, Any]]:
+    _, msg_col = await _motor_collections()
+    if msg_col is None:
+        return await _fallback(get_last_user_message, conv_id)
+    doc = await msg_col.find_one({"conversation_id": conv_id, "role": "user"}, sort=[("created_at", -1)])
+    return _last_user_out(conv_id, doc)
+
+
+async def aset_conversation_stopped(conv_id: str, stopped: bool) -> None:
+    conv_col, _ = await _motor_collections()
+    if conv_col is None:
+        return await _fallback(set_conversation_stopped, conv_id, stopped)
+    await conv_col.update_one({"_id": conv_id}, {"$set": {"stopped": stopped}})
@@ -0,0 +1,96 @@
+"""Pack routed days by time instead of by stop count.
+
+Each day gets a minute budget (TRIP_SUGGEST_DAY_MINUTES) starting at
+TRIP_SUGGEST_DAY_START. Stops are taken in route order and kept while their
+visit plus the leg from the previous kept stop still fits; a stop that does
+not fit is skipped so a shorter one further along can still use the time.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+DAY_MINUTES = int(os.getenv("TRIP_SUGGEST_DAY_MINUTES", "480"))
+DAY_START = os.getenv("TRIP_SUGGEST_DAY_START", "09:00")
+
+# Fallback when no real travel time is known: ~30 km/h in cities, at least 5 minutes
+_MINUTES_PER_KM = 2.0
+_MIN_LEG_MINUTES = 5
+
+
+def _parse_clock(value: str) -> int:
+    try:
+        hours, minutes = value.strip().split(":", 1)
+        return int(hours) * 60 + int(minutes)
+    except (ValueError, AttributeError):
+        return 9 * 60
+
+
+def format_clock(minute_of_day: int) -> str:
+    """Minutes since midnight -> "HH:MM" (wraps past midnight)."""
+    minute_of_day %= 24 * 60
+    return f"{minute_of_day // 60:02d}:{minute_of_day % 60:02d}"
+
+
+def estimate_travel_minutes(km: float) -> int:
+    return max(_MIN_LEG_MINUTES, round(km * _MINUTES_PER_KM))
+
+
+def travel_minutes_matrix(dist_km: np.ndarray) -> np.ndarray:
+    """Vectorized ``estimate_travel_minutes`` over a distance matrix (0 on the diagonal)."""
+    minutes = np.maximum(_MIN_LEG_MINUTES, np.round(dist_km * _MINUTES_PER_KM)).astype(int)
+    np.fill_diagonal(minutes, 0)
+    return minutes
+
+
+def max_stops_per_day(visit_minutes: Sequence[int], day_minutes: Optional[int] = None) -> int:
+    """Upper bound on stops a day can hold, used to size day clusters with some slack."""
+    budget = DAY_MINUTES if day_minutes is None else day_minutes
+    if not len(visit_minutes):
+        return 1
+    typical = float(np.median(visit_minutes)) + _MIN_LEG_MINUTES * 3
+    return max(1, int(budget // max(typical, 1.0)) + 1)
+
+
+def pack_day(
+    stops: Sequence[int],
+    visit_minutes: Dict[int, int],
+    travel_minutes: np.ndarray,
+    day_minutes: Optional[int] = None,
+) -> List[int]:
+    """Keep the stops (in order) that fit in ``day_minutes``; one pass over ``stops``.
+
+    ``travel_minutes`` is indexed by the same ids as ``stops``. The first stop
+    is always kept so a day is never empty.
+    """
+    budget = DAY_MINUTES if day_minutes is None else day_minutes
+    kept: List[int] = []
+    used = 0
+    for stop in stops:
+        leg = int(travel_minutes[kept[-1], stop]) if kept else 0
+        cost = leg + visit_minutes[stop]
+        if kept and used + cost > budget:
+            continue
+        kept.append(stop)
+        used += cost
+    return kept
+
+
+def timeline(
+    visit_minutes: Sequence[int],
+    leg_minutes: Sequence[Optional[int]],
+    day_start: Optional[str] = None,
+) -> List[Tuple[int, int]]:
+    """(start, end) minute-of-day per stop; ``leg_minutes[i]`` is the leg into stop i."""
+    clock = _parse_clock(DAY_START if day_start is None else day_start)
+    times: List[Tuple[int, int]] = []
+    for i, visit in enumerate(visit_minutes):
+        if i > 0:
+            clock += leg_minutes[i] or 0
+        times.append((clock, clock + visit))
+        clock += visit
+    return times
@@ -0,0 +1,281 @@
+"""SQLite-backed persistent cache tier, so instances come up warm after a restart.
+
+Point TRIP_SUGGEST_DISK_CACHE_PATH at a mounted volume or a baked snapshot.
+The database is opened lazily on first use; writes are queued and flushed by
+a background thread so request threads never wait on disk.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import CacheBackend
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at);
+CREATE INDEX IF NOT EXISTS cache_updated_at ON cache (updated_at);
+"""
+
+
+class DiskCacheBackend(CacheBackend):
+    """Persistent cache in a single SQLite file with TTL and a total size cap."""
+
+    name = "disk"
+
+    def __init__(self, path: str, *, max_bytes: int = 256 * 1024 * 1024, flush_interval: float = 1.0) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], Optional[Tuple[str, float]]] = {}
+        self._pending_lock = threading.Lock()
+        self._wakeup: "queue.Queue[bool]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        # Held from taking a pending batch until it is committed, so batches land in order
+        self._flush_lock = threading.Lock()
+        # Running total of the size column, loaded once when the database is opened
+        self._total_bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "pruned": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += n
+
+    # --- connection / writer lifecycle ---
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None:
+            return self._conn
+        with self._conn_lock:
+            if self._conn is None:
+                try:
+                    directory = os.path.dirname(os.path.abspath(self.path))
+                    os.makedirs(directory, exist_ok=True)
+                    conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                    conn.executescript(_SCHEMA)
+                    self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+                    self._conn = conn
+                except sqlite3.Error as e:
+                    logging.warning("Disk cache unavailable at %s: %s", self.path, e)
+                    self._count("errors")
+                    return None
+        return self._conn
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._pending_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, name="disk-cache-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def _writer_loop(self) -> None:
+        while True:
+            try:
+                self._wakeup.get(timeout=self.flush_interval)
+            except queue.Empty:
+                pass
+            self.flush()
+
+    # --- CacheBackend ---
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[Any, float]]:
+        with self._pending_lock:
+            if (namespace, key) in self._pending:
+                pending = self._pending[(namespace, key)]
+                if pending is None:
+                    return None
+                return json.loads(pending[0]), pending[1]
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            with self._conn_lock:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                    (namespace, key, time.time()),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logging.warning("Disk cache read failed: %s", e)
+            self._count("errors")
+            return None
+        if row is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return json.loads(row[0]), float(row[1])
+
+    def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Tuple[Any, float]]:
+        hits: Dict[str, Tuple[Any, float]] = {}
+        remaining: List[str] = []
+        with self._pending_lock:
+            for key in keys:
+                if (namespace, key) in self._pending:
+                    pending = self._pending[(namespace, key)]
+                    if pending is not None:
+                        hits[key] = (json.loads(pending[0]), pending[1])
+                else:
+                    remaining.append(key)
+        conn = self._connection() if remaining else None
+        if conn is None:
+            return hits
+        now = time.time()
+        try:
+            with self._conn_lock:
+                # Stay well under SQLite's bound-parameter limit
+                for start in range(0, len(remaining), 500):
+                    chunk = remaining[start : start + 500]
+                    rows = conn.execute(
+                        "SELECT key, value, expires_at FROM cache WHERE namespace = ? AND expires_at > ? "
+                        f"AND key IN ({','.join('?' * len(chunk))})",
+                        (namespace, now, *chunk),
+                    ).fetchall()
+                    for key, value, expires_at in rows:
+                        hits[key] = (json.loads(value), float(expires_at))
+        except sqlite3.Error as e:
+            logging.warning("Disk cache read failed: %s", e)
+            self._count("errors")
+            return hits
+        found = sum(1 for key in remaining if key in hits)
+        self._count("hits", found)
+        self._count("misses", len(remaining) - found)
+        return hits
+
+    def set(self, namespace: str, key: str, value: Any, expires_at: float) -> None:
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+        with self._pending_lock:
+            self._pending[(namespace, key)] = (payload, expires_at)
+        self._ensure_writer()
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._pending_lock:
+            self._pending[(namespace, key)] = None
+        self._ensure_writer()
+        self._wakeup.put(True)
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        with self._flush_lock:
+            self._flush_locked()
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                with self._conn_lock:
+                    if namespace is None:
+                        conn.execute("DELETE FROM cache")
+                        self._total_bytes = 0
+                    else:
+                        self._total_bytes -= conn.execute(
+                            "SELECT COALESCE(SUM(size), 0) FROM cache WHERE namespace = ?", (namespace,)
+                        ).fetchone()[0]
+                        conn.execute("DELETE FROM cache WHERE namespace = ?", (namespace,))
+            except sqlite3.Error as e:
+                logging.warning("Disk cache clear failed: %s", e)
+                self._count("errors")
+
+    # --- write-back ---
+
+    def flush(self) -> None:
+        """Write queued entries to disk and enforce TTL and the size cap."""
+        with self._flush_lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        with self._pending_lock:
+            batch = self._pending
+            self._pending = {}
+        if not batch:
+            return
+        conn = self._connection()
+        if conn is None:
+            return
+        now = time.time()
+        upserts: List[Tuple[str, str, str, float, int, float]] = []
+        for (namespace, key), item in batch.items():
+            if item is not None and item[1] > now:
+                upserts.append((namespace, key, item[0], item[1], len(item[0]), now))
+        try:
+            with self._conn_lock:
+                conn.execute("BEGIN")
+                # Sizes of the rows being replaced or deleted keep the running total exact
+                replaced = 0
+                for namespace, key in batch:
+                    row = conn.execute(
+                        "SELECT size FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+                    ).fetchone()
+                    replaced += row[0] if row else 0
+                conn.executemany("DELETE FROM cache WHERE namespace = ? AND key = ?", list(batch))
+                conn.executemany(
+                    "INSERT INTO cache (namespace, key, value, expires_at, size, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    upserts,
+                )
+                conn.execute("COMMIT")
+                self._total_bytes += sum(row[4] for row in upserts) - replaced
+                self._count("writes", len(upserts))
+                self._prune(conn, now)
+        except sqlite3.Error as e:
+            logging.warning("Disk cache flush failed: %s", e)
+            self._count("errors")
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+
+    def _prune(self, conn: sqlite3.Connection, now: float) -> None:
+        expired = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache WHERE expires_at <= ?", (now,)).fetchone()[0]
+        pruned = conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,)).rowcount
+        self._total_bytes -= expired
+        # Drop the least recently written entries, a chunk at a time, until we are back under the cap
+        while self.max_bytes and self._total_bytes > self.max_bytes:
+            rows = conn.execute("SELECT rowid, size FROM cache ORDER BY updated_at ASC LIMIT 256").fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            excess = self._total_bytes - self.max_bytes
+            victims = []
+            for rowid, size in rows:
+                if excess <= 0:
+                    break
+                victims.append((rowid,))
+                excess -= size
+                self._total_bytes -= size
+            conn.executemany("DELETE FROM cache WHERE rowid = ?", victims)
+            pruned += len(victims)
+        self._count("pruned", max(0, pruned))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats["path"] = self.path
+        stats["bytes"] = self._total_bytes
+        stats["max_bytes"] = self.max_bytes
+        with self._pending_lock:
+            stats["pending_writes"] = len(self._pending)
+        return stats
@@ -0,0 +1,165 @@
+"""Bundled offline gazetteer of common destinations.
+
+``app/data/gazetteer.tsv`` lists cities and regions with aliases, admin area,
+country, ISO code, currency and coordinates. The file is memory-mapped and
+only an index of normalized names -> row offsets is kept in Python, so rows
+are decoded on demand. Lookups are exact on normalized text ("Bangalore",
+"bengaluru", "Jaipur, Rajasthan", "Cambridge, UK"); a name shared by several
+rows (e.g. "Perth") is ambiguous and returns None so the caller can fall
+back to Places.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import mmap
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from .cache_keys import normalize_text
+
+
+_DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "gazetteer.tsv")
+_COLUMNS = ("name", "aliases", "admin", "country", "country_code", "currency", "lat", "lon", "kind")
+# Keys that are also everyday words ("nice!"); free-text callers should not treat them as place mentions
+COMMON_WORD_KEYS = frozenset({"nice", "male", "kl", "reading"})
+
+
+class Gazetteer:
+    """Exact and prefix lookups over a memory-mapped TSV of places."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._mm: Optional[mmap.mmap] = None
+        self._exact: Dict[str, List[int]] = {}
+        self._keys: List[str] = []
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._stats = {"hits": 0, "misses": 0, "ambiguous": 0}
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                with open(self.path, "rb") as f:
+                    self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as e:
+                logging.warning("Gazetteer unavailable at %s: %s", self.path, e)
+                self._loaded = True
+                return
+            exact: Dict[str, List[int]] = {}
+            offset = 0
+            for line in iter(self._mm.readline, b""):
+                if not line.startswith(b"#") and line.strip():
+                    for key in self._row_keys(self._parse(line)):
+                        offsets = exact.setdefault(key, [])
+                        if offset not in offsets:
+                            offsets.append(offset)
+                offset += len(line)
+            self._exact = exact
+            self._keys = sorted(exact)
+            self._loaded = True
+
+    @staticmethod
+    def _parse(line: bytes) -> Dict[str, Any]:
+        row: Dict[str, Any] = dict(zip(_COLUMNS, line.decode("utf-8").rstrip("\r\n").split("\t")))
+        row["lat"] = float(row["lat"])
+        row["lon"] = float(row["lon"])
+        return row
+
+    @staticmethod
+    def _row_keys(row: Dict[str, Any]) -> List[str]:
+        names = [row["name"]] + [a for a in row["aliases"].split("|") if a]
+        countries = [c for c in row["country"].split("|") if c] + [row["country_code"]]
+        keys = []
+        for name in names:
+            keys.append(name)
+            keys.extend(f"{name} {country}" for country in countries)
+            if row["admin"] and normalize_text(row["admin"]) != normalize_text(name):
+                keys.append(f"{name} {row['admin']}")
+                keys.extend(f"{name} {row['admin']} {country}" for country in countries)
+        return list(dict.fromkeys(normalize_text(k) for k in keys if k))
+
+    def _row_at(self, offset: int) -> Dict[str, Any]:
+        assert self._mm is not None
+        end = self._mm.find(b"\n", offset)
+        row = self._parse(self._mm[offset : end if end >= 0 else len(self._mm)])
+        row["country"] = row["country"].split("|")[0]
+        row.pop("aliases", None)
+        return row
+
+    def matches(self, text: str) -> List[Dict[str, Any]]:
+        """Every place whose name/alias (optionally with admin area or country) equals ``text``."""
+        self._load()
+        return [self._row_at(o) for o in self._exact.get(normalize_text(text), [])]
+
+    def lookup(self, text: str) -> Optional[Dict[str, Any]]:
+        """The single place ``text`` names, or None when unknown or ambiguous."""
+        found = self.matches(text)
+        with self._lock:
+            if len(found) == 1:
+                self._stats["hits"] += 1
+                return found[0]
+            self._stats["ambiguous" if found else "misses"] += 1
+        return None
+
+    def prefix(self, text: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Places with a normalized key starting with ``text``, shortest keys first."""
+        self._load()
+        needle = normalize_text(text)
+        if not needle:
+            return []
+        start = bisect.bisect_left(self._keys, needle)
+        keys = []
+        for key in self._keys[start:]:
+            if not key.startswith(needle):
+                break
+            keys.append(key)
+        offsets: List[int] = []
+        for key in sorted(keys, key=len):
+            for o in self._exact[key]:
+                if o not in offsets:
+                    offsets.append(o)
+            if len(offsets) >= limit:
+                break
+        return [self._row_at(o) for o in offsets[:limit]]
+
+    def mentions(self, text: str, max_words: int = 5) -> List[str]:
+        """Normalized place keys appearing in free text, taking the longest match at each position."""
+        self._load()
+        tokens = normalize_text(text).split()
+        found: List[str] = []
+        i = 0
+        while i < len(tokens):
+            for n in range(min(max_words, len(tokens) - i), 0, -1):
+                key = " ".join(tokens[i : i + n])
+                if key in self._exact:
+                    found.append(key)
+                    i += n
+                    break
+            else:
+                i += 1
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats["keys"] = len(self._keys)
+        stats["path"] = self.path
+        return stats
+
+
+_GAZETTEER: Optional[Gazetteer] = None
+
+
+def get_gazetteer() -> Gazetteer:
+    """Process-wide gazetteer from TRIP_SUGGEST_GAZETTEER_PATH (defaults to the bundled file)."""
+    global _GAZETTEER
+    if _GAZETTEER is None:
+        _GAZETTEER = Gazetteer(os.getenv("TRIP_SUGGEST_GAZETTEER_PATH", _DEFAULT_PATH))
+    return _GAZETTEER
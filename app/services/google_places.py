@@ -2,7 +2,7 @@ from __future__ import annotations
 import os
 from typing import Any, Dict, List, Optional, Tuple
 
-import requests
+from . import http_client
 
 
 def _api_key() -> str:
@@ -19,6 +19,10 @@ def geocode(query: str, *, language: Optional[str] = None, region: Optional[str]
     """
     # Prefer v1 to avoid legacy errors
     data = text_search_v1(query, language=language, region=region)
+    return _geocode_items(data)
+
+
+def _geocode_items(data: Dict[str, Any]) -> Dict[str, Any]:
     items = [
         {
             "name": it.get("name"),
@@ -60,7 +64,7 @@ def nearby_search(
     if language:
         params["language"] = language
 
-    r = requests.get(url, params=params, timeout=10)
+    r = http_client.get(url, params=params, timeout=10)
     r.raise_for_status()
     data = r.json() or {}
     results = data.get("results", []) or []
@@ -107,6 +111,23 @@ def nearby_search_v1(
     NOTE: keyword parameter is ignored in v1 API, use included_type instead
     """
     key = _api_key()
+    url, request_kwargs = _nearby_search_v1_request(
+        key, lat=lat, lon=lon, radius=radius, included_type=included_type, language=language
+    )
+    r = http_client.post(url, timeout=12, **request_kwargs)
+    r.raise_for_status()
+    return _parse_nearby_search_v1(r.json() or {}, key)
+
+
+def _nearby_search_v1_request(
+    key: str,
+    *,
+    lat: float,
+    lon: float,
+    radius: int,
+    included_type: Optional[str],
+    language: Optional[str],
+) -> Tuple[str, Dict[str, Any]]:
     url = "https://places.googleapis.com/v1/places:searchNearby"
 
     body: Dict[str, Any] = {
@@ -142,10 +163,10 @@ def nearby_search_v1(
         "X-Goog-FieldMask": field_mask,
         "Content-Type": "application/json",
     }
+    return url, {"headers": headers, "json": body}
 
-    r = requests.post(url, headers=headers, json=body, timeout=12)
-    r.raise_for_status()
-    data = r.json() or {}
+
+def _parse_nearby_search_v1(data: Dict[str, Any], key: str) -> Dict[str, Any]:
     places = data.get("places", []) or []
 
     items: List[Dict[str, Any]] = []
@@ -195,7 +216,17 @@ def distance_matrix(
     """
     if not origins or not destinations:
         return {"rows": []}
-    key = _api_key()
+    url, request_kwargs = _distance_matrix_request(_api_key(), origins, destinations)
+    r = http_client.get(url, timeout=10, **request_kwargs)
+    r.raise_for_status()
+    return _parse_distance_matrix(r.json() or {})
+
+
+def _distance_matrix_request(
+    key: str,
+    origins: List[Tuple[float, float]],
+    destinations: List[Tuple[float, float]],
+) -> Tuple[str, Dict[str, Any]]:
     url = "https://maps.googleapis.com/maps/api/distancematrix/json"
     origin_str = "|".join([f"{lat},{lon}" for lat, lon in origins])
     dest_str = "|".join([f"{lat},{lon}" for lat, lon in destinations])
@@ -205,9 +236,10 @@ def distance_matrix(
         "destinations": dest_str,
         "units": "metric",
     }
-    r = requests.get(url, params=params, timeout=10)
-    r.raise_for_status()
-    data = r.json() or {}
+    return url, {"params": params}
+
+
+def _parse_distance_matrix(data: Dict[str, Any]) -> Dict[str, Any]:
     rows = []
     for row in data.get("rows", []) or []:
         elements = []
@@ -224,6 +256,43 @@ def distance_matrix(
         rows.append({"elements": elements})
     return {"rows": rows}
 
+
+# Distance Matrix allows at most 25 origins or 25 destinations, and 100 elements, per request
+DM_MAX_DIMENSION = 25
+DM_MAX_ELEMENTS = 100
+
+
+def distance_matrix_batches(
+    pairs: List[Tuple[Tuple[float, float], Tuple[float, float]]],
+) -> List[Tuple[List[Tuple[float, float]], List[Tuple[float, float]], List[Tuple[int, int, int]]]]:
+    """Group (origin, destination) pairs into Distance Matrix requests that bill only those pairs.
+
+    Each batch is one origin with many destinations, or many origins with one
+    destination, so origins x destinations never includes an unwanted element;
+    legs sharing no endpoint (a chain of consecutive stops) are 1x1 requests.
+    Returns [(origins, destinations, [(pair_index, row, col)])].
+    """
+    size = min(DM_MAX_DIMENSION, DM_MAX_ELEMENTS)
+    by_origin: Dict[Tuple[float, float], List[int]] = {}
+    for idx, (origin, _dest) in enumerate(pairs):
+        by_origin.setdefault(origin, []).append(idx)
+
+    batches = []
+    by_destination: Dict[Tuple[float, float], List[int]] = {}
+    for origin, idxs in by_origin.items():
+        if len(idxs) == 1:
+            by_destination.setdefault(pairs[idxs[0]][1], []).append(idxs[0])
+            continue
+        for start in range(0, len(idxs), size):
+            chunk = idxs[start : start + size]
+            batches.append(([origin], [pairs[i][1] for i in chunk], [(i, 0, col) for col, i in enumerate(chunk)]))
+    for dest, idxs in by_destination.items():
+        for start in range(0, len(idxs), size):
+            chunk = idxs[start : start + size]
+            batches.append(([pairs[i][0] for i in chunk], [dest], [(i, row, 0) for row, i in enumerate(chunk)]))
+    return batches
+
+
 def nearby_attractions(
     *, lat: float, lon: float, radius: int = 5000, language: str | None = None
 ) -> Dict[str, Any]:
@@ -241,7 +310,7 @@ def nearby_attractions(
     }
     if language:
         params["language"] = language
-    r = requests.get(url, params=params, timeout=10)
+    r = http_client.get(url, params=params, timeout=10)
     r.raise_for_status()
     data = r.json() or {}
     results = data.get("results", []) or []
@@ -288,7 +357,7 @@ def text_search(query: str, *, language: str | None = None, region: str | None =
     if region:
         # ccTLD region bias, e.g., 'in', 'us'
         params["region"] = region.lower()
-    r = requests.get(url, params=params, timeout=10)
+    r = http_client.get(url, params=params, timeout=10)
     r.raise_for_status()
     data = r.json() or {}
     status = (data.get("status") or "").upper()
@@ -345,6 +414,20 @@ def text_search_v1(
     Requires headers: X-Goog-Api-Key and X-Goog-FieldMask
     """
     key = _api_key()
+    url, request_kwargs = _text_search_v1_request(key, query, language=language, region=region, limit=limit)
+    r = http_client.post(url, timeout=12, **request_kwargs)
+    r.raise_for_status()
+    return _parse_text_search_v1(r.json() or {}, key)
+
+
+def _text_search_v1_request(
+    key: str,
+    query: str,
+    *,
+    language: Optional[str],
+    region: Optional[str],
+    limit: Optional[int],
+) -> Tuple[str, Dict[str, Any]]:
     url = "https://places.googleapis.com/v1/places:searchText"
 
     body: Dict[str, Any] = {"textQuery": query}
@@ -378,10 +461,10 @@ def text_search_v1(
         "X-Goog-FieldMask": field_mask,
         "Content-Type": "application/json",
     }
+    return url, {"headers": headers, "json": body}
 
-    r = requests.post(url, headers=headers, json=body, timeout=12)
-    r.raise_for_status()
-    data = r.json() or {}
+
+def _parse_text_search_v1(data: Dict[str, Any], key: str) -> Dict[str, Any]:
     places = data.get("places", []) or []
 
     items: List[Dict[str, Any]] = []
@@ -446,6 +529,15 @@ def lodging_text_search_v1(location_name: str, *, limit: int = 10, language: Opt
     Returns: { items: [ { id, name, lat, lon } ] }
     """
     key = _api_key()
+    url, request_kwargs = _lodging_text_search_v1_request(key, location_name, limit=limit, language=language)
+    r = http_client.post(url, timeout=12, **request_kwargs)
+    r.raise_for_status()
+    return _parse_lodging_text_search_v1(r.json() or {}, key)
+
+
+def _lodging_text_search_v1_request(
+    key: str, location_name: str, *, limit: int, language: Optional[str]
+) -> Tuple[str, Dict[str, Any]]:
     url = "https://places.googleapis.com/v1/places:searchText"
     body: Dict[str, Any] = {
         "textQuery": f"lodging in {location_name}",
@@ -471,9 +563,10 @@ def lodging_text_search_v1(location_name: str, *, limit: int = 10, language: Opt
         "X-Goog-FieldMask": field_mask,
         "Content-Type": "application/json",
     }
-    r = requests.post(url, headers=headers, json=body, timeout=12)
-    r.raise_for_status()
-    data = r.json() or {}
+    return url, {"headers": headers, "json": body}
+
+
+def _parse_lodging_text_search_v1(data: Dict[str, Any], key: str) -> Dict[str, Any]:
     places = data.get("places", []) or []
     items: List[Dict[str, Any]] = []
     for pl in places:
@@ -508,7 +601,13 @@ def place_details_v1(place_id: str) -> Dict[str, Any]:
 
     Returns processed place details with description, types, rating, etc.
     """
-    key = _api_key()
+    url, request_kwargs = _place_details_v1_request(_api_key(), place_id)
+    r = http_client.get(url, timeout=10, **request_kwargs)
+    r.raise_for_status()
+    return _parse_place_details_v1(r.json() or {}, place_id)
+
+
+def _place_details_v1_request(key: str, place_id: str) -> Tuple[str, Dict[str, Any]]:
     url = f"https://places.googleapis.com/v1/{place_id}"
     field_mask = ",".join([
         "editorialSummary",
@@ -532,10 +631,10 @@ def place_details_v1(place_id: str) -> Dict[str, Any]:
         "X-Goog-FieldMask": field_mask,
         "Content-Type": "application/json",
     }
-    r = requests.get(url, headers=headers, timeout=10)
-    r.raise_for_status()
-    data = r.json() or {}
-    
+    return url, {"headers": headers}
+
+
+def _parse_place_details_v1(data: Dict[str, Any], place_id: str) -> Dict[str, Any]:
     # Extract the best available description
     description = None
     
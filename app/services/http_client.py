@@ -0,0 +1,159 @@
+"""Shared keep-alive HTTP sessions for outbound API calls.
+
+One ``requests.Session`` is kept per host (scheme + netloc) with its own
+connection pool, so repeated Google Places / Distance Matrix calls reuse
+TCP+TLS connections instead of handshaking on every request.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Dict, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+_POOL_CONNECTIONS = int(os.getenv("PLACES_HTTP_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.getenv("PLACES_HTTP_POOL_MAXSIZE", "32"))
+_MAX_RETRIES = int(os.getenv("PLACES_HTTP_MAX_RETRIES", "0"))
+_CONNECT_TIMEOUT = float(os.getenv("PLACES_HTTP_CONNECT_TIMEOUT", "3.05"))
+# When set, overrides the per-call read timeouts used by google_places
+_READ_TIMEOUT_OVERRIDE = os.getenv("PLACES_HTTP_READ_TIMEOUT")
+
+_LOCK = threading.Lock()
+_SESSIONS: Dict[str, requests.Session] = {}
+_STATS: Dict[str, Dict[str, int]] = {}
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=_POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=_MAX_RETRIES,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """Return the shared session for the host of ``url``, creating it on first use."""
+    host = _host_key(url)
+    session = _SESSIONS.get(host)
+    if session is not None:
+        return session
+    with _LOCK:
+        session = _SESSIONS.get(host)
+        if session is None:
+            session = _new_session()
+            _SESSIONS[host] = session
+            _STATS[host] = {"requests": 0, "errors": 0}
+        return session
+
+
+def resolve_timeout(timeout: Union[float, Tuple[float, float], None]) -> Tuple[float, float]:
+    """Expand a read timeout into the (connect, read) pair used for pooled requests."""
+    if isinstance(timeout, tuple):
+        return timeout
+    read = float(_READ_TIMEOUT_OVERRIDE) if _READ_TIMEOUT_OVERRIDE else float(timeout or 10)
+    return (_CONNECT_TIMEOUT, read)
+
+
+def _count(host: str, *, error: bool = False) -> None:
+    with _LOCK:
+        counters = _STATS.setdefault(host, {"requests": 0, "errors": 0})
+        counters["requests"] += 1
+        if error:
+            counters["errors"] += 1
+
+
+def request(
+    method: str,
+    url: str,
+    *,
+    timeout: Union[float, Tuple[float, float], None] = 10,
+    **kwargs: Any,
+) -> requests.Response:
+    """Issue an HTTP request over the pooled session for the target host."""
+    session = get_session(url)
+    host = _host_key(url)
+    try:
+        resp = session.request(method, url, timeout=resolve_timeout(timeout), **kwargs)
+    except requests.RequestException:
+        _count(host, error=True)
+        raise
+    _count(host)
+    return resp
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def _pool_counts(session: requests.Session) -> Tuple[int, int]:
+    """Sum (connections opened, requests sent) across the urllib3 pools of a session."""
+    opened = 0
+    sent = 0
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+        if pools is None:
+            continue
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += int(getattr(pool, "num_connections", 0) or 0)
+            sent += int(getattr(pool, "num_requests", 0) or 0)
+    return opened, sent
+
+
+def get_stats() -> Dict[str, Any]:
+    """Per-host request counts and connection reuse metrics."""
+    with _LOCK:
+        sessions = dict(_SESSIONS)
+        counters = {host: dict(values) for host, values in _STATS.items()}
+    hosts: Dict[str, Any] = {}
+    for host, session in sessions.items():
+        opened, sent = _pool_counts(session)
+        reused = max(0, sent - opened)
+        hosts[host] = {
+            **counters.get(host, {}),
+            "connections_opened": opened,
+            "connections_reused": reused,
+            "reuse_ratio": round(reused / sent, 3) if sent else None,
+        }
+    return {
+        "pool_maxsize": POOL_MAXSIZE,
+        "connect_timeout": _CONNECT_TIMEOUT,
+        "hosts": hosts,
+    }
+
+
+def close() -> None:
+    """Close all pooled sessions (e.g. on application shutdown)."""
+    with _LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+        _STATS.clear()
+    for session in sessions:
+        try:
+            session.close()
+        except Exception:
+            pass
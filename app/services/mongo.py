@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import logging
 from functools import lru_cache
@@ -9,6 +10,18 @@ from pymongo import MongoClient
 from pymongo.errors import PyMongoError
 
 
+def _client_kwargs() -> dict:
+    kwargs = {"serverSelectionTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "3000"))}
+    # Optionally use certifi CA bundle to avoid local cert store issues
+    try:
+        import certifi  # type: ignore
+
+        kwargs["tlsCAFile"] = certifi.where()
+    except Exception:
+        pass
+    return kwargs
+
+
 @lru_cache(maxsize=1)
 def get_mongo_client() -> Optional[MongoClient]:
     uri = os.getenv("MONGO_URI")
@@ -16,17 +29,7 @@ def get_mongo_client() -> Optional[MongoClient]:
         return None
     # Create client, then verify connectivity. If it fails, fall back to None
     try:
-        timeout_ms = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "3000"))
-        tls_kwargs = {}
-        # Optionally use certifi CA bundle to avoid local cert store issues
-        try:
-            import certifi  # type: ignore
-
-            tls_kwargs["tlsCAFile"] = certifi.where()
-        except Exception:
-            pass
-
-        client = MongoClient(uri, serverSelectionTimeoutMS=timeout_ms, **tls_kwargs)
+        client = MongoClient(uri, **_client_kwargs())
         # Force a quick server selection by doing a lightweight command
         client.admin.command("ping")
         return client
@@ -41,3 +44,38 @@ def get_database():
         return None
     db_name = os.getenv("MONGO_DB", "tripper")
     return client[db_name]
+
+
+async def amongo_available() -> bool:
+    """Whether Mongo is reachable, without blocking the event loop on the first ping."""
+    if get_mongo_client.cache_info().currsize:
+        return get_mongo_client() is not None
+    # The first call pings the server (up to MONGO_CONNECT_TIMEOUT_MS); do it off the loop
+    return await asyncio.to_thread(get_mongo_client) is not None
+
+
+@lru_cache(maxsize=1)
+def get_async_mongo_client():
+    """Motor client for the async request path, or None without MONGO_URI or motor.
+
+    Constructing it does no I/O; check ``amongo_available()`` before use.
+    """
+    uri = os.getenv("MONGO_URI")
+    if not uri:
+        return None
+    try:
+        from motor.motor_asyncio import AsyncIOMotorClient  # type: ignore
+    except ImportError:
+        return None
+    return AsyncIOMotorClient(uri, **_client_kwargs())
+
+
+async def aget_async_database():
+    """Motor database when Mongo is reachable and motor is installed, else None."""
+    if not await amongo_available():
+        return None
+    client = get_async_mongo_client()
+    if client is None:
+        return None
+    db_name = os.getenv("MONGO_DB", "tripper")
+    return client[db_name]
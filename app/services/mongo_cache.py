@@ -0,0 +1,186 @@
+"""MongoDB-backed shared cache tier, so Places results are reused across instances."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.collection import Collection
+from pymongo.errors import PyMongoError
+
+from .cache import CacheBackend
+from .mongo import get_database
+
+
+class MongoCacheBackend(CacheBackend):
+    """Cache documents in a collection with a TTL index on ``expires_at``.
+
+    When ``get_database()`` returns None (no MONGO_URI or Mongo unreachable)
+    every call is a no-op miss, so callers fall back to the in-memory tier.
+    After an error the backend stays quiet for ``retry_after`` seconds rather
+    than blocking each request on server selection.
+    """
+
+    name = "mongo"
+
+    def __init__(self, collection_name: Optional[str] = None, retry_after: float = 30) -> None:
+        self.collection_name = collection_name or os.getenv("TRIP_SUGGEST_MONGO_CACHE_COLLECTION", "places_cache")
+        self.retry_after = retry_after
+        self._indexed = False
+        self._disabled_until = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _collection(self) -> Optional[Collection]:
+        if time.time() < self._disabled_until:
+            return None
+        db = get_database()
+        if db is None:
+            return None
+        col = db[self.collection_name]
+        if not self._indexed:
+            # Mongo removes documents once expires_at has passed
+            col.create_index("expires_at", expireAfterSeconds=0)
+            col.create_index("namespace")
+            self._indexed = True
+        return col
+
+    def _failed(self, op: str, exc: Exception) -> None:
+        self._count("errors")
+        self._disabled_until = time.time() + self.retry_after
+        logging.warning("Mongo cache %s failed, using memory cache only for %ss: %s", op, self.retry_after, exc)
+
+    @staticmethod
+    def _doc_id(namespace: str, key: str) -> str:
+        return f"{namespace}::{key}"
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[Any, float]]:
+        try:
+            col = self._collection()
+            if col is None:
+                return None
+            doc = col.find_one({"_id": self._doc_id(namespace, key)}, projection={"value": 1, "expires_at": 1})
+        except PyMongoError as e:
+            self._failed("read", e)
+            return None
+        if not doc or not isinstance(doc.get("expires_at"), datetime):
+            self._count("misses")
+            return None
+        expires_at = doc["expires_at"]
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        self._count("hits")
+        return doc.get("value"), expires_at.timestamp()
+
+    def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Tuple[Any, float]]:
+        if not keys:
+            return {}
+        try:
+            col = self._collection()
+            if col is None:
+                return {}
+            docs = list(
+                col.find(
+                    {"_id": {"$in": [self._doc_id(namespace, key) for key in keys]}},
+                    projection={"value": 1, "expires_at": 1},
+                )
+            )
+        except PyMongoError as e:
+            self._failed("read", e)
+            return {}
+        prefix = len(self._doc_id(namespace, ""))
+        hits: Dict[str, Tuple[Any, float]] = {}
+        for doc in docs:
+            expires_at = doc.get("expires_at")
+            if not isinstance(expires_at, datetime):
+                continue
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            hits[doc["_id"][prefix:]] = (doc.get("value"), expires_at.timestamp())
+        with self._lock:
+            self._stats["hits"] += len(hits)
+            self._stats["misses"] += len(keys) - len(hits)
+        return hits
+
+    def set(self, namespace: str, key: str, value: Any, expires_at: float) -> None:
+        try:
+            col = self._collection()
+            if col is None:
+                return
+            col.update_one(
+                {"_id": self._doc_id(namespace, key)},
+                {
+                    "$set": {
+                        "namespace": namespace,
+                        "value": value,
+                        "expires_at": datetime.fromtimestamp(expires_at, tz=timezone.utc),
+                        "updated_at": datetime.now(timezone.utc),
+                    }
+                },
+                upsert=True,
+            )
+            self._count("writes")
+        except PyMongoError as e:
+            self._failed("write", e)
+        except Exception as e:
+            # e.g. values BSON cannot encode; skip the shared tier for this entry
+            logging.warning("Mongo cache skipped %s::%s: %s", namespace, key, e)
+
+    def increment(
+        self, namespace: str, key: str, deltas: Dict[str, float], expires_at: float
+    ) -> Optional[Dict[str, float]]:
+        try:
+            col = self._collection()
+            if col is None:
+                return None
+            doc = col.find_one_and_update(
+                {"_id": self._doc_id(namespace, key)},
+                {
+                    "$inc": {f"value.{field}": delta for field, delta in deltas.items()},
+                    "$set": {
+                        "namespace": namespace,
+                        "expires_at": datetime.fromtimestamp(expires_at, tz=timezone.utc),
+                        "updated_at": datetime.now(timezone.utc),
+                    },
+                },
+                projection={"value": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            self._count("writes")
+        except PyMongoError as e:
+            self._failed("increment", e)
+            return None
+        value = (doc or {}).get("value")
+        return value if isinstance(value, dict) else None
+
+    def delete(self, namespace: str, key: str) -> None:
+        try:
+            col = self._collection()
+            if col is not None:
+                col.delete_one({"_id": self._doc_id(namespace, key)})
+        except PyMongoError as e:
+            self._failed("delete", e)
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        try:
+            col = self._collection()
+            if col is not None:
+                col.delete_many({} if namespace is None else {"namespace": namespace})
+        except PyMongoError as e:
+            self._failed("clear", e)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["available"] = get_database() is not None and time.time() >= self._disabled_until
+        return stats
@@ -0,0 +1,159 @@
+"""In-memory spatial index of POIs already returned by Places searches.
+
+POIs are bucketed in a lat/lon grid together with their types, rating, their
+position in the search that last returned them and when that was. Plain
+nearby searches also record a coverage circle for their query tag
+(type/language); searches that are not bounded by the circle (keyword text
+search, fallbacks) add POIs without coverage. A later search whose circle lies inside
+a fresh coverage circle with the same tag (give or take ``tolerance`` of its
+radius) is answered from the index, so a slightly different geocode of the
+same city costs no Places call.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import route_planner
+
+
+_KM_PER_DEG_LAT = 111.32
+
+
+class POIIndex:
+    """Grid-bucketed POIs plus per-tag coverage circles, both expiring after ``ttl`` seconds."""
+
+    def __init__(
+        self,
+        *,
+        cell_deg: float = 0.05,
+        ttl: float = 6 * 3600,
+        max_points: int = 100000,
+        max_coverage: int = 5000,
+        min_results: int = 5,
+        tolerance: float = 0.15,
+    ) -> None:
+        self.cell_deg = cell_deg
+        self.ttl = ttl
+        self.max_points = max_points
+        self.max_coverage = max_coverage
+        self.min_results = min_results
+        self.tolerance = tolerance
+        self._cells: Dict[Tuple[int, int], Dict[str, Dict[str, Any]]] = {}
+        # place_id -> cell, oldest first, for eviction
+        self._points: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()
+        # tag -> [(lat, lon, radius_km, fetched_at)]
+        self._coverage: Dict[str, List[Tuple[float, float, float, float]]] = {}
+        self._searches = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "added": 0, "evicted": 0}
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def add(
+        self,
+        items: Iterable[Dict[str, Any]],
+        lat: float,
+        lon: float,
+        radius_m: float,
+        tag: str,
+        *,
+        covered: bool = True,
+    ) -> None:
+        """Index search results; with ``covered`` also mark the searched circle as covered for ``tag``."""
+        now = time.time()
+        with self._lock:
+            self._searches += 1
+            for position, item in enumerate(items):
+                pid = item.get("place_id") or item.get("id")
+                if not pid or item.get("lat") is None or item.get("lon") is None:
+                    continue
+                cell = self._cell(float(item["lat"]), float(item["lon"]))
+                old_cell = self._points.pop(pid, None)
+                record = None
+                old_bucket = self._cells.get(old_cell) if old_cell else None
+                if old_bucket is not None:
+                    record = old_bucket.pop(pid, None)
+                    if not old_bucket:
+                        del self._cells[old_cell]
+                tags = set(record["tags"]) if record else set()
+                tags.add(tag)
+                self._cells.setdefault(cell, {})[pid] = {
+                    "item": dict(item),
+                    "tags": tags,
+                    "seen_at": now,
+                    "rank": (self._searches, position),
+                }
+                self._points[pid] = cell
+                self._stats["added"] += 1
+            while len(self._points) > self.max_points:
+                pid, cell = self._points.popitem(last=False)
+                bucket = self._cells.get(cell)
+                if bucket is not None:
+                    bucket.pop(pid, None)
+                    if not bucket:
+                        del self._cells[cell]
+                self._stats["evicted"] += 1
+            if not covered:
+                return
+            circles = [c for c in self._coverage.get(tag, []) if now - c[3] < self.ttl]
+            circles.append((lat, lon, radius_m / 1000.0, now))
+            self._coverage[tag] = circles[-self.max_coverage :]
+
+    def _covered(self, lat: float, lon: float, radius_km: float, tag: str, now: float) -> bool:
+        circles = [c for c in self._coverage.get(tag, []) if now - c[3] < self.ttl]
+        if not circles:
+            return False
+        centers = route_planner.haversine_pairs([(lat, lon)] * len(circles), [(c[0], c[1]) for c in circles])
+        return any(d + radius_km <= c[2] * (1 + self.tolerance) for d, c in zip(centers.tolist(), circles))
+
+    def query(self, lat: float, lon: float, radius_m: float, tag: str, *, limit: int = 20) -> Optional[List[Dict[str, Any]]]:
+        """Fresh indexed POIs for ``tag`` within the circle in upstream order; None when not covered.
+
+        POIs keep their position in the search that last returned them, newest search first.
+        """
+        radius_km = radius_m / 1000.0
+        now = time.time()
+        with self._lock:
+            if not self._covered(lat, lon, radius_km, tag, now):
+                self._stats["misses"] += 1
+                return None
+            dlat = radius_km / _KM_PER_DEG_LAT
+            dlon = radius_km / max(1e-6, _KM_PER_DEG_LAT * math.cos(math.radians(lat)))
+            lo_lat, lo_lon = self._cell(lat - dlat, lon - dlon)
+            hi_lat, hi_lon = self._cell(lat + dlat, lon + dlon)
+            candidates = [
+                record
+                for i in range(lo_lat, hi_lat + 1)
+                for j in range(lo_lon, hi_lon + 1)
+                for record in self._cells.get((i, j), {}).values()
+                if tag in record["tags"] and now - record["seen_at"] < self.ttl
+            ]
+            if candidates:
+                dist = route_planner.haversine_pairs(
+                    [(lat, lon)] * len(candidates),
+                    [(float(r["item"]["lat"]), float(r["item"]["lon"])) for r in candidates],
+                )
+                candidates = [r for r, d in zip(candidates, dist.tolist()) if d <= radius_km]
+            if len(candidates) < self.min_results:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+        candidates.sort(key=lambda r: (-r["rank"][0], r["rank"][1]))
+        return [dict(r["item"]) for r in candidates[:limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["points"] = len(self._points)
+            stats["cells"] = len(self._cells)
+            stats["coverage_circles"] = sum(len(c) for c in self._coverage.values())
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+        stats["ttl_seconds"] = self.ttl
+        return stats
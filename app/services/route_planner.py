@@ -0,0 +1,297 @@
+"""Vectorized distance and sequencing helpers for itinerary planning.
+
+A plan computes one pairwise great-circle distance matrix up front (index 0
+is the origin, 1..n the candidate POIs) and every later stage - sequencing,
+day chunking, distance labels - reads from it instead of recomputing
+haversine distances in Python loops.
+
+``improve_route`` then runs 2-opt and Or-opt local search over that matrix
+under a hard CPU time budget, keeping the first stop fixed, and
+``plan_days`` splits the stops into geographically compact days with a
+capacity-balanced k-medoids before sequencing each day.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_matrix(coords: Sequence[Tuple[float, float]]) -> np.ndarray:
+    """Pairwise great-circle distances in km for a list of (lat, lon) points."""
+    if len(coords) == 0:
+        return np.zeros((0, 0))
+    pts = np.radians(np.asarray(coords, dtype=float))
+    lat = pts[:, 0][:, None]
+    lon = pts[:, 1][:, None]
+    dlat = lat.T - lat
+    dlon = lon.T - lon
+    h = np.sin(dlat / 2.0) ** 2 + np.cos(lat) * np.cos(lat.T) * np.sin(dlon / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def haversine_pairs(
+    origins: Sequence[Tuple[float, float]], destinations: Sequence[Tuple[float, float]]
+) -> np.ndarray:
+    """Great-circle km between ``origins[i]`` and ``destinations[i]`` for each i."""
+    if len(origins) == 0:
+        return np.zeros(0)
+    a = np.radians(np.asarray(origins, dtype=float))
+    b = np.radians(np.asarray(destinations, dtype=float))
+    dlat = b[:, 0] - a[:, 0]
+    dlon = b[:, 1] - a[:, 1]
+    h = np.sin(dlat / 2.0) ** 2 + np.cos(a[:, 0]) * np.cos(b[:, 0]) * np.sin(dlon / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def nearest_neighbor_order(dist: np.ndarray, start: int = 0) -> List[int]:
+    """Greedy nearest-neighbour tour over ``dist`` starting at ``start``.
+
+    Returns every index exactly once, beginning with ``start``.
+    """
+    n = dist.shape[0]
+    if n == 0:
+        return []
+    visited = np.zeros(n, dtype=bool)
+    order = [start]
+    visited[start] = True
+    current = start
+    for _ in range(n - 1):
+        row = np.where(visited, np.inf, dist[current])
+        current = int(np.argmin(row))
+        visited[current] = True
+        order.append(current)
+    return order
+
+
+def path_length(dist: np.ndarray, order: Sequence[int]) -> float:
+    """Total length of an open path visiting ``order`` in sequence."""
+    if len(order) < 2:
+        return 0.0
+    idx = np.asarray(order)
+    return float(dist[idx[:-1], idx[1:]].sum())
+
+
+_EPS = 1e-9
+_STATS: Dict[str, float] = {"runs": 0, "moves": 0, "km_saved": 0.0, "budget_exhausted": 0}
+_LOCK = threading.Lock()
+
+
+def _two_opt_pass(dist: np.ndarray, order: List[int], deadline: float) -> bool:
+    """Apply the first improving segment reversal found; keeps ``order[0]`` fixed."""
+    m = len(order)
+    o = np.asarray(order)
+    for i in range(1, m - 1):
+        if time.process_time() > deadline:
+            return False
+        a, b = o[i - 1], o[i]
+        ks = np.arange(i + 1, m)
+        c = o[ks]
+        has_next = ks < m - 1
+        nxt = o[np.minimum(ks + 1, m - 1)]
+        removed = dist[a, b] + np.where(has_next, dist[c, nxt], 0.0)
+        added = dist[a, c] + np.where(has_next, dist[b, nxt], 0.0)
+        delta = added - removed
+        best = int(np.argmin(delta))
+        if delta[best] < -_EPS:
+            k = int(ks[best])
+            order[i : k + 1] = order[i : k + 1][::-1]
+            return True
+    return False
+
+
+def _or_opt_pass(dist: np.ndarray, order: List[int], deadline: float, max_segment: int = 3) -> bool:
+    """Move one segment of 1..``max_segment`` stops (optionally reversed) to a cheaper slot."""
+    m = len(order)
+    for seg_len in range(1, max_segment + 1):
+        for i in range(1, m - seg_len + 1):
+            if time.process_time() > deadline:
+                return False
+            seg = order[i : i + seg_len]
+            head, tail = seg[0], seg[-1]
+            prev = order[i - 1]
+            nxt = order[i + seg_len] if i + seg_len < m else None
+            if nxt is None:
+                gain = dist[prev, head]
+            else:
+                gain = dist[prev, head] + dist[tail, nxt] - dist[prev, nxt]
+            rest = np.asarray(order[:i] + order[i + seg_len :])
+            left = rest
+            right = np.append(rest[1:], -1)
+            has_right = right >= 0
+            right = np.where(has_right, right, 0)
+            base = np.where(has_right, dist[left, right], 0.0)
+            fwd = dist[left, head] + np.where(has_right, dist[tail, right], 0.0) - base
+            rev = dist[left, tail] + np.where(has_right, dist[head, right], 0.0) - base
+            cost = np.minimum(fwd, rev)
+            # Re-inserting at the original slot is not a move
+            cost[i - 1] = np.inf
+            j = int(np.argmin(cost))
+            if gain - cost[j] > _EPS:
+                if rev[j] < fwd[j]:
+                    seg = seg[::-1]
+                rest_list = rest.tolist()
+                order[:] = rest_list[: j + 1] + seg + rest_list[j + 1 :]
+                return True
+    return False
+
+
+def improve_route(
+    dist: np.ndarray, order: Sequence[int], *, time_budget_s: float = 0.05
+) -> Tuple[List[int], Dict[str, Any]]:
+    """Shorten an open path with 2-opt and Or-opt moves until no move helps or
+    ``time_budget_s`` of CPU time is spent. ``order[0]`` never moves.
+
+    Returns the improved order and a small report (distances in km).
+    """
+    route = [int(i) for i in order]
+    initial = path_length(dist, route)
+    started = time.process_time()
+    deadline = started + max(0.0, time_budget_s)
+    moves = 0
+    exhausted = False
+    if len(route) > 3:
+        while True:
+            if time.process_time() > deadline:
+                exhausted = True
+                break
+            if _two_opt_pass(dist, route, deadline) or _or_opt_pass(dist, route, deadline):
+                moves += 1
+                continue
+            exhausted = time.process_time() > deadline
+            break
+    final = path_length(dist, route)
+    report = {
+        "initial_km": round(initial, 2),
+        "final_km": round(final, 2),
+        "saved_km": round(initial - final, 2),
+        "moves": moves,
+        "budget_exhausted": exhausted,
+        "cpu_ms": round((time.process_time() - started) * 1000, 2),
+    }
+    with _LOCK:
+        _STATS["runs"] += 1
+        _STATS["moves"] += moves
+        _STATS["km_saved"] += initial - final
+        _STATS["budget_exhausted"] += int(exhausted)
+    return route, report
+
+
+def get_stats() -> Dict[str, Any]:
+    """Cumulative route improvement counters for this process."""
+    with _LOCK:
+        stats: Dict[str, Any] = dict(_STATS)
+    stats["km_saved"] = round(stats["km_saved"], 2)
+    return stats
+
+
+def _assign_balanced(dist: np.ndarray, medoids: List[int], capacity: int) -> np.ndarray:
+    """Assign every point to a medoid without overfilling any.
+
+    Each round, unassigned points propose to their nearest medoid with room
+    left and every medoid accepts its closest proposers up to capacity.
+    """
+    n = dist.shape[0]
+    k = len(medoids)
+    d = dist[:, medoids]  # (n, k)
+    labels = np.full(n, -1)
+    room = np.full(k, capacity)
+    pending = np.arange(n)
+    while len(pending):
+        masked = np.where(room > 0, d[pending], np.inf)
+        choice = np.argmin(masked, axis=1)
+        cost = masked[np.arange(len(pending)), choice]
+        order = np.lexsort((cost, choice))
+        choice_sorted = choice[order]
+        first = np.searchsorted(choice_sorted, choice_sorted, side="left")
+        rank = np.arange(len(order)) - first
+        accepted = rank < room[choice_sorted]
+        winners = pending[order[accepted]]
+        labels[winners] = choice_sorted[accepted]
+        room -= np.bincount(choice_sorted[accepted], minlength=k)
+        pending = pending[order[~accepted]]
+    return labels
+
+
+def balanced_k_medoids(dist: np.ndarray, k: int, capacity: int, *, max_iter: int = 20) -> List[List[int]]:
+    """Split the points of ``dist`` into ``k`` clusters of at most ``capacity`` each.
+
+    Medoids start from the most central point and then farthest-first, and
+    alternate with capacity-constrained assignment until they stop moving.
+    Returns the member indices of each non-empty cluster.
+    """
+    n = dist.shape[0]
+    if n == 0 or k <= 0:
+        return []
+    k = min(k, n)
+    capacity = max(capacity, math.ceil(n / k))
+    medoids = [int(np.argmin(dist.sum(axis=1)))]
+    nearest = dist[medoids[0]].copy()
+    while len(medoids) < k:
+        nxt = int(np.argmax(nearest))
+        medoids.append(nxt)
+        nearest = np.minimum(nearest, dist[nxt])
+    labels = _assign_balanced(dist, medoids, capacity)
+    for _ in range(max_iter):
+        new_medoids = []
+        for c in range(k):
+            members = np.flatnonzero(labels == c)
+            if len(members) == 0:
+                new_medoids.append(medoids[c])
+                continue
+            costs = dist[np.ix_(members, members)].sum(axis=1)
+            new_medoids.append(int(members[int(np.argmin(costs))]))
+        if new_medoids == medoids:
+            break
+        medoids = new_medoids
+        labels = _assign_balanced(dist, medoids, capacity)
+    return [np.flatnonzero(labels == c).tolist() for c in range(k) if np.any(labels == c)]
+
+
+def plan_days(
+    dist: np.ndarray, n_days: int, per_day: int, *, time_budget_s: float = 0.05
+) -> Tuple[List[List[int]], Dict[str, Any]]:
+    """Pick stops near the origin (index 0), cluster them into days and route each day.
+
+    Each day is sequenced from the origin with nearest-neighbour and, when
+    ``time_budget_s`` is positive, improved with ``improve_route`` sharing
+    that budget. Returns per-day lists of matrix indices (origin excluded)
+    and a combined route report.
+    """
+    report: Dict[str, Any] = {
+        "initial_km": 0.0, "final_km": 0.0, "saved_km": 0.0, "moves": 0, "budget_exhausted": False, "cpu_ms": 0.0,
+    }
+    n = dist.shape[0] - 1
+    if n <= 0 or n_days <= 0 or per_day <= 0:
+        return [], report
+    started = time.process_time()
+    total = min(n, n_days * per_day)
+    candidates = (np.argsort(dist[0, 1:], kind="stable")[:total] + 1).tolist()
+    clusters = balanced_k_medoids(dist[np.ix_(candidates, candidates)], n_days, per_day)
+
+    days: List[List[int]] = []
+    for day_no, members in enumerate(clusters):
+        nodes = [0] + [candidates[m] for m in members]
+        sub = dist[np.ix_(nodes, nodes)]
+        order = nearest_neighbor_order(sub, start=0)
+        if time_budget_s > 0:
+            remaining = time_budget_s - (time.process_time() - started)
+            order, day_report = improve_route(sub, order, time_budget_s=remaining / (len(clusters) - day_no))
+            for key in ("initial_km", "final_km", "saved_km", "moves"):
+                report[key] += day_report[key]
+            report["budget_exhausted"] = report["budget_exhausted"] or day_report["budget_exhausted"]
+        days.append([nodes[i] for i in order[1:]])
+
+    # Closest day first
+    days.sort(key=lambda day: float(dist[0, day].mean()))
+    for key in ("initial_km", "final_km", "saved_km"):
+        report[key] = round(report[key], 2)
+    report["cpu_ms"] = round((time.process_time() - started) * 1000, 2)
+    return days, report
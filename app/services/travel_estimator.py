@@ -0,0 +1,172 @@
+"""Per-city road distance and travel time estimates learned from Distance Matrix results.
+
+For every city we keep running sums over observed legs: the circuity factor
+(road km / straight-line km) and a linear fit of minutes against
+straight-line km. Once a city has enough samples and a small enough
+residual error, legs are answered locally with an error bound instead of
+calling the API. Models are stored in the trip planning cache (namespace
+"travel_model"), so they reach the shared tiers and survive restarts; new
+observations are added to the stored sums atomically and each instance
+reloads a city's model every ``reload_interval`` seconds.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .cache import LRUCache
+
+
+# Very short legs are dominated by fixed overhead and GPS noise; don't learn from them
+_MIN_LEARN_KM = 0.3
+_MIN_LEG_MINUTES = 1
+
+
+class CityTravelModel:
+    """Mergeable sufficient statistics for one city's legs."""
+
+    _FIELDS = ("n", "sx", "sy", "sxx", "sxy", "syy", "sc", "scc")
+
+    def __init__(self, **sums: float) -> None:
+        for name in self._FIELDS:
+            setattr(self, name, float(sums.get(name, 0.0)))
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "CityTravelModel":
+        return cls(**{k: v for k, v in (data or {}).items() if k in cls._FIELDS})
+
+    def to_dict(self) -> Dict[str, float]:
+        return {name: getattr(self, name) for name in self._FIELDS}
+
+    def observe(self, straight_km: float, road_km: float, minutes: float) -> bool:
+        if straight_km < _MIN_LEARN_KM or road_km <= 0 or minutes <= 0:
+            return False
+        circuity = road_km / straight_km
+        self.n += 1
+        self.sx += straight_km
+        self.sy += minutes
+        self.sxx += straight_km * straight_km
+        self.sxy += straight_km * minutes
+        self.syy += minutes * minutes
+        self.sc += circuity
+        self.scc += circuity * circuity
+        return True
+
+    def _fit(self) -> Optional[Dict[str, float]]:
+        n = self.n
+        if n < 3:
+            return None
+        var_x = self.sxx - self.sx * self.sx / n
+        if var_x <= 1e-9:
+            return None
+        slope = (self.sxy - self.sx * self.sy / n) / var_x
+        intercept = (self.sy - slope * self.sx) / n
+        sse = self.syy - intercept * self.sy - slope * self.sxy
+        residual = math.sqrt(max(0.0, sse) / (n - 2))
+        circuity = self.sc / n
+        circuity_sd = math.sqrt(max(0.0, self.scc / n - circuity * circuity))
+        return {
+            "minutes_per_km": slope,
+            "base_minutes": intercept,
+            "residual_minutes": residual,
+            "mean_minutes": self.sy / n,
+            "circuity": circuity,
+            "circuity_sd": circuity_sd,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        fit = self._fit() or {}
+        return {"samples": int(self.n), **{k: round(v, 3) for k, v in fit.items()}}
+
+    def estimate(self, straight_km: float, *, min_samples: int, max_rel_error: float) -> Optional[Dict[str, Any]]:
+        """Element-shaped estimate, or None when this city's model is not confident yet."""
+        if self.n < min_samples:
+            return None
+        fit = self._fit()
+        if fit is None or fit["minutes_per_km"] <= 0 or fit["mean_minutes"] <= 0:
+            return None
+        if fit["residual_minutes"] / fit["mean_minutes"] > max_rel_error:
+            return None
+        if fit["circuity_sd"] / fit["circuity"] > max_rel_error:
+            return None
+        minutes = max(_MIN_LEG_MINUTES, fit["base_minutes"] + fit["minutes_per_km"] * straight_km)
+        road_km = max(straight_km, fit["circuity"] * straight_km)
+        return {
+            "distance_meters": round(road_km * 1000),
+            "duration_seconds": round(minutes * 60),
+            "error_seconds": round(fit["residual_minutes"] * 60),
+            "estimated": True,
+        }
+
+
+class TravelEstimator:
+    """Per-city ``CityTravelModel``s kept in memory and persisted through an ``LRUCache``."""
+
+    def __init__(
+        self,
+        cache: LRUCache,
+        *,
+        namespace: str = "travel_model",
+        min_samples: int = 20,
+        max_rel_error: float = 0.25,
+        reload_interval: float = 300,
+    ) -> None:
+        self.cache = cache
+        self.namespace = namespace
+        self.min_samples = min_samples
+        self.max_rel_error = max_rel_error
+        self.reload_interval = reload_interval
+        # city -> (model, loaded at)
+        self._models: Dict[str, Tuple[CityTravelModel, float]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"local_answers": 0, "declined": 0, "observations": 0, "reloads": 0}
+
+    def _model(self, city: str) -> CityTravelModel:
+        now = time.time()
+        with self._lock:
+            cached = self._models.get(city)
+        if cached is not None and now - cached[1] < self.reload_interval:
+            return cached[0]
+        stored = self.cache.get_shared(self.namespace, city)
+        with self._lock:
+            if stored is None and cached is not None:
+                # Nothing newer in the cache tiers; keep what we have
+                model = cached[0]
+            else:
+                model = CityTravelModel.from_dict(stored)
+                self._stats["reloads"] += 1
+            self._models[city] = (model, now)
+        return model
+
+    def estimate(self, city: str, straight_km: float) -> Optional[Dict[str, Any]]:
+        model = self._model(city)
+        with self._lock:
+            result = model.estimate(straight_km, min_samples=self.min_samples, max_rel_error=self.max_rel_error)
+            self._stats["local_answers" if result is not None else "declined"] += 1
+        return result
+
+    def observe_many(self, city: str, legs: Any) -> None:
+        """Learn from (straight_km, distance_meters, duration_seconds) tuples and add them to the stored sums."""
+        delta = CityTravelModel()
+        learned = 0
+        for straight_km, meters, seconds in legs:
+            if isinstance(meters, (int, float)) and isinstance(seconds, (int, float)):
+                learned += delta.observe(straight_km, meters / 1000.0, seconds / 60.0)
+        if not learned:
+            return
+        totals = self.cache.increment(self.namespace, city, delta.to_dict())
+        with self._lock:
+            self._models[city] = (CityTravelModel.from_dict(totals), time.time())
+            self._stats["observations"] += learned
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["cities"] = {city: model.summary() for city, (model, _) in self._models.items()}
+        stats["min_samples"] = self.min_samples
+        stats["max_rel_error"] = self.max_rel_error
+        stats["reload_interval"] = self.reload_interval
+        return stats
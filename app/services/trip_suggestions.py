@@ -1,17 +1,97 @@
 from __future__ import annotations
 
+import copy
 import math
 import os
-import time
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from . import google_places
+from . import day_scheduler, google_places, route_planner
+from .cache import CacheBackend, LRUCache
+from .cache_keys import KeyStats, alias_variants, normalize_text
+from .gazetteer import get_gazetteer
+from .poi_index import POIIndex
+from .travel_estimator import TravelEstimator
 from typing import Tuple
 
 
-# --- Simple in-memory cache (process-local) ---
-_CACHE: Dict[str, Tuple[float, Any]] = {}
+def _cache_backends() -> List[CacheBackend]:
+    """Shared tiers under the in-process cache, from TRIP_SUGGEST_CACHE_BACKENDS (comma separated)."""
+    backends: List[CacheBackend] = []
+    for name in os.getenv("TRIP_SUGGEST_CACHE_BACKENDS", "disk,mongo").split(","):
+        name = name.strip().lower()
+        if name == "disk" and os.getenv("TRIP_SUGGEST_DISK_CACHE_PATH"):
+            from .disk_cache import DiskCacheBackend
+
+            backends.append(
+                DiskCacheBackend(
+                    os.environ["TRIP_SUGGEST_DISK_CACHE_PATH"],
+                    max_bytes=int(os.getenv("TRIP_SUGGEST_DISK_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+                )
+            )
+        elif name == "mongo":
+            from .mongo_cache import MongoCacheBackend
+
+            backends.append(MongoCacheBackend())
+    return backends
+
+
+# --- Bounded in-memory cache (LRU + per-namespace TTL) over optional shared tiers ---
 _CACHE_TTL_SECONDS = int(os.getenv("TRIP_SUGGEST_CACHE_TTL", "900"))  # 15 minutes default
+_CACHE = LRUCache(
+    max_entries=int(os.getenv("TRIP_SUGGEST_CACHE_MAX_ENTRIES", "5000")),
+    max_bytes=int(os.getenv("TRIP_SUGGEST_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    default_ttl=_CACHE_TTL_SECONDS,
+    namespace_ttls={
+        # Geocodes are stable, search results less so
+        "geocode": int(os.getenv("TRIP_SUGGEST_CACHE_TTL_GEOCODE", str(24 * 3600))),
+        # Normalized free text -> resolved place_id
+        "alias": int(os.getenv("TRIP_SUGGEST_CACHE_TTL_ALIAS", str(30 * 24 * 3600))),
+        "near": int(os.getenv("TRIP_SUGGEST_CACHE_TTL_NEAR", str(_CACHE_TTL_SECONDS))),
+        "stay": int(os.getenv("TRIP_SUGGEST_CACHE_TTL_STAY", str(_CACHE_TTL_SECONDS))),
+        # Place Details barely change, so they are kept much longer (7 days default)
+        "details": int(os.getenv("TRIP_SUGGEST_DETAILS_CACHE_TTL", str(7 * 24 * 3600))),
+        # Travel distance/duration per directed leg between two places (30 days default)
+        "edge": int(os.getenv("TRIP_SUGGEST_EDGE_CACHE_TTL", str(30 * 24 * 3600))),
+        # Learned per-city travel models (see travel_estimator)
+        "travel_model": int(os.getenv("TRIP_SUGGEST_TRAVEL_MODEL_TTL", str(90 * 24 * 3600))),
+        # Finished trip plans, keyed by canonical trip parameters (0 disables memoization)
+        "plan": int(os.getenv("TRIP_SUGGEST_PLAN_CACHE_TTL", "3600")),
+    },
+    backends=_cache_backends(),
+    # Empty results and upstream failures are remembered briefly so bad inputs don't hammer Places
+    negative_ttl=int(os.getenv("TRIP_SUGGEST_NEGATIVE_CACHE_TTL", "60")),
+    # Expired entries are still served this long while one background refresh runs
+    stale_ttl=int(os.getenv("TRIP_SUGGEST_CACHE_STALE_TTL", "3600")),
+)
+_GEOCODE_KEY_STATS = KeyStats()
+
+# Place Details enrichment runs concurrently on a shared pool, with a per-batch deadline
+_DETAILS_MAX_WORKERS = int(os.getenv("TRIP_SUGGEST_DETAILS_WORKERS", "8"))
+_DETAILS_DEADLINE_SECONDS = float(os.getenv("TRIP_SUGGEST_DETAILS_DEADLINE", "6"))
+_DETAILS_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, _DETAILS_MAX_WORKERS), thread_name_prefix="place-details")
+
+# Distance Matrix batches run concurrently on a shared pool, with a per-plan deadline
+_DM_MAX_WORKERS = int(os.getenv("TRIP_SUGGEST_DM_WORKERS", "4"))
+_DM_DEADLINE_SECONDS = float(os.getenv("TRIP_SUGGEST_DM_DEADLINE", "8"))
+_DM_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, _DM_MAX_WORKERS), thread_name_prefix="distance-matrix")
+
+# POIs from earlier searches answer nearby queries over areas they already cover
+_POI_INDEX = POIIndex(
+    ttl=int(os.getenv("TRIP_SUGGEST_POI_INDEX_TTL", str(6 * 3600))),
+    max_points=int(os.getenv("TRIP_SUGGEST_POI_INDEX_MAX_POINTS", "100000")),
+)
+
+# Legs are estimated locally once a city's learned model is confident enough
+_TRAVEL_ESTIMATOR = TravelEstimator(
+    _CACHE,
+    min_samples=int(os.getenv("TRIP_SUGGEST_TRAVEL_MIN_SAMPLES", "20")),
+    max_rel_error=float(os.getenv("TRIP_SUGGEST_TRAVEL_MAX_ERROR", "0.25")),
+    reload_interval=float(os.getenv("TRIP_SUGGEST_TRAVEL_RELOAD", "300")),
+)
+
+# CPU time allowed per plan for 2-opt/Or-opt route improvement (0 disables it)
+_ROUTE_OPT_BUDGET_SECONDS = float(os.getenv("TRIP_SUGGEST_ROUTE_OPT_BUDGET_MS", "50")) / 1000.0
 
 
 TRIP_TYPE_TO_QUERY: Dict[str, Dict[str, Any]] = {
@@ -132,6 +212,17 @@ CURRENCY_TO_USD_RATES = {
     "THB": 0.029,   # 1 THB ≈ 0.029 USD
     "MYR": 0.22,    # 1 MYR ≈ 0.22 USD
     "SGD": 0.74,    # 1 SGD ≈ 0.74 USD
+    "CHF": 1.13,    # 1 CHF ≈ 1.13 USD
+    "AED": 0.27,    # 1 AED ≈ 0.27 USD
+    "NZD": 0.60,    # 1 NZD ≈ 0.60 USD
+    "HKD": 0.128,   # 1 HKD ≈ 0.128 USD
+    "KRW": 0.00073, # 1 KRW ≈ 0.00073 USD
+    "VND": 0.000039,  # 1 VND ≈ 0.000039 USD
+    "IDR": 0.000062,  # 1 IDR ≈ 0.000062 USD
+    "LKR": 0.0033,  # 1 LKR ≈ 0.0033 USD
+    "NPR": 0.0075,  # 1 NPR ≈ 0.0075 USD
+    "MVR": 0.065,   # 1 MVR ≈ 0.065 USD
+    "TRY": 0.03,    # 1 TRY ≈ 0.03 USD
 }
 
 # Country to currency mapping
@@ -154,25 +245,59 @@ COUNTRY_TO_CURRENCY = {
     "thailand": "THB",
     "malaysia": "MYR",
     "singapore": "SGD",
+    "united states of america": "USD",
+    "us": "USD",
+    "scotland": "GBP",
+    "great britain": "GBP",
+    "portugal": "EUR",
+    "greece": "EUR",
+    "austria": "EUR",
+    "ireland": "EUR",
+    "belgium": "EUR",
+    "switzerland": "CHF",
+    "united arab emirates": "AED",
+    "uae": "AED",
+    "new zealand": "NZD",
+    "hong kong": "HKD",
+    "south korea": "KRW",
+    "korea": "KRW",
+    "vietnam": "VND",
+    "viet nam": "VND",
+    "indonesia": "IDR",
+    "sri lanka": "LKR",
+    "nepal": "NPR",
+    "maldives": "MVR",
+    "turkey": "TRY",
+    "türkiye": "TRY",
 }
 
 
 def _detect_currency_from_location(location: str, geo_data: Dict[str, Any] = None) -> str:
-    """Detect likely currency based on location name or geocoded data."""
-    location_lower = location.lower()
-    
+    """Detect likely currency based on location name or geocoded data.
+
+    Matches are exact on normalized country names: the gazetteer's currency,
+    the geocoded country or address tail, then the user's own "..., <country>".
+    """
     # Try to extract country info from geocoded data
     if geo_data and geo_data.get("items"):
         first_result = geo_data["items"][0]
-        country = (first_result.get("country") or "").lower()
+        if first_result.get("currency"):
+            return first_result["currency"]
+        country = normalize_text(first_result.get("country"))
         if country in COUNTRY_TO_CURRENCY:
             return COUNTRY_TO_CURRENCY[country]
-    
-    # Fallback: check location name for country hints
-    for country, currency in COUNTRY_TO_CURRENCY.items():
-        if country in location_lower:
-            return currency
-    
+        # Places results carry the country as the last part of the address
+        address_country = normalize_text((first_result.get("formatted_address") or "").split(",")[-1])
+        if address_country in COUNTRY_TO_CURRENCY:
+            return COUNTRY_TO_CURRENCY[address_country]
+
+    place = get_gazetteer().lookup(location)
+    if place:
+        return place["currency"]
+    location_country = normalize_text(location.split(",")[-1])
+    if location_country in COUNTRY_TO_CURRENCY:
+        return COUNTRY_TO_CURRENCY[location_country]
+
     # Default to USD if we can't determine
     return "USD"
 
@@ -223,56 +348,334 @@ def _format_duration(minutes: int) -> str:
             return f"{hours}h {remaining_minutes}m"
 
 
+def _cache_namespace(key: str) -> str:
+    # Keys are "<namespace>::<parts...>", e.g. "geocode::Goa::en::IN"
+    return key.split("::", 1)[0]
+
+
 def _cache_get(key: str) -> Optional[Any]:
-    item = _CACHE.get(key)
-    if not item:
-        return None
-    ts, value = item
-    if (time.time() - ts) > _CACHE_TTL_SECONDS:
-        _CACHE.pop(key, None)
-        return None
-    return value
+    return _CACHE.get(_cache_namespace(key), key)
 
 
 def _cache_set(key: str, value: Any) -> None:
-    _CACHE[key] = (time.time(), value)
-
-
-def _haversine_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
-    R = 6371.0
-    lat1, lon1 = math.radians(a[0]), math.radians(a[1])
-    lat2, lon2 = math.radians(b[0]), math.radians(b[1])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    h = (
-        math.sin(dlat / 2) ** 2
-        + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
-    )
-    return 2 * R * math.asin(math.sqrt(h))
+    _CACHE.set(_cache_namespace(key), key, value)
+
+
+def _is_empty_result(value: Any) -> bool:
+    return not isinstance(value, dict) or not value.get("items")
 
 
-def _sequence_by_nearest_neighbor(points: List[Dict[str, Any]], start: Tuple[float, float]) -> List[Dict[str, Any]]:
-    remaining = points[:]
-    ordered: List[Dict[str, Any]] = []
-    current = start
-    while remaining:
-        nearest_idx = min(
-            range(len(remaining)),
-            key=lambda i: _haversine_km(current, (remaining[i]["lat"], remaining[i]["lon"])),
+def _cache_get_or_load(key: str, loader: Callable[[], Any]) -> Any:
+    """Cached Places lookup: empty results/errors are negatively cached, stale hits revalidate."""
+    return _CACHE.get_or_load(_cache_namespace(key), key, loader, is_negative=_is_empty_result)
+
+
+def _gazetteer_item(place: Dict[str, Any]) -> Dict[str, Any]:
+    """Gazetteer row in the shape of a ``google_places.geocode`` item (plus country/currency)."""
+    parts = [place["name"], place.get("admin"), place["country"]]
+    address = ", ".join(dict.fromkeys(p for p in parts if p))
+    return {
+        "name": place["name"],
+        "lat": place["lat"],
+        "lon": place["lon"],
+        "place_id": f"gaz:{place['country_code'].lower()}:{normalize_text(place['name']).replace(' ', '-')}",
+        "formatted_address": address,
+        "country": place["country"],
+        "currency": place["currency"],
+    }
+
+
+def _geocode_location(location: str, language: Optional[str], region: Optional[str]) -> Dict[str, Any]:
+    """Geocode free text through the cache, using normalized text and place_id aliases.
+
+    Geocode results are stored under the resolved place_id; every spelling
+    that resolved to it ("Goa", "goa ", "Goa, India") becomes an alias.
+    """
+    # Well-known destinations resolve offline; Places handles unknown or ambiguous text
+    place = get_gazetteer().lookup(location)
+    if place:
+        return {"items": [_gazetteer_item(place)]}
+
+    suffix = f"{language or ''}::{region or ''}"
+    normalized = normalize_text(location)
+    place_id = _cache_get(f"alias::{normalized}::{suffix}")
+    geo_key = f"geocode::{place_id or 'q:' + normalized}::{suffix}"
+    loaded: List[bool] = []
+
+    def _load() -> Dict[str, Any]:
+        loaded.append(True)
+        geo = google_places.geocode(location, language=language, region=region)
+        first = (geo.get("items") or [None])[0]
+        if first and first.get("place_id"):
+            pid_key = f"geocode::{first['place_id']}::{suffix}"
+            if pid_key != geo_key:
+                _cache_set(pid_key, geo)
+            for variant in alias_variants(location, first):
+                _cache_set(f"alias::{variant}::{suffix}", first["place_id"])
+        return geo
+
+    try:
+        return _cache_get_or_load(geo_key, _load)
+    finally:
+        _GEOCODE_KEY_STATS.record(f"{location}::{suffix}", hit=not loaded)
+
+
+def _search_stays(query_term: str, origin_name: str, language: Optional[str], region: Optional[str]) -> Dict[str, Any]:
+    try:
+        # Use text search for accommodations
+        full_query = f"{query_term} in {origin_name}"
+        return google_places.text_search_v1(
+            query=full_query,
+            language=language,
+            region=region,
+            limit=5
         )
-        next_point = remaining.pop(nearest_idx)
-        ordered.append(next_point)
-        current = (next_point["lat"], next_point["lon"])
-    return ordered
+    except Exception:
+        # Fallback to lodging search
+        try:
+            return google_places.lodging_text_search_v1(
+                origin_name, limit=5, language=language
+            )
+        except Exception:
+            return {"items": []}
+
+
+def _search_trip_pois(
+    origin: Dict[str, Any],
+    origin_lat: float,
+    origin_lon: float,
+    search_radius_m: int,
+    keyword: Optional[str],
+    type_filter: Optional[str],
+    language: Optional[str],
+) -> Tuple[Dict[str, Any], bool]:
+    """Search results, and whether they came from a plain nearby search bounded by the circle.
+
+    ``nearby_search_v1`` ignores ``keyword``, so its results cover the circle for any tag.
+    """
+    # Strategy: Use text search for keyword-based queries, nearby search for type-based queries
+    try:
+        if keyword and not type_filter:
+            # Use text search for keyword-based queries (more flexible)
+            location_name = origin.get("name", "unknown location")
+            query = f"{keyword.split(' OR ')[0]} near {location_name}"
+            return google_places.text_search_v1(
+                query=query,
+                language=language,
+                limit=20
+            ), False
+        # Use nearby search for type-based queries
+        return google_places.nearby_search_v1(
+            lat=origin_lat,
+            lon=origin_lon,
+            radius=search_radius_m,
+            included_type=type_filter,
+            language=language,
+        ), True
+    except Exception:
+        # Fallback: legacy generalized nearby (best-effort), then attractions
+        try:
+            return google_places.nearby_search(
+                lat=origin_lat,
+                lon=origin_lon,
+                radius=search_radius_m,
+                type_filter=type_filter,
+                keyword=keyword,
+                language=language,
+            ), False
+        except Exception:
+            return google_places.nearby_attractions(
+                lat=origin_lat, lon=origin_lon, radius=search_radius_m, language=language
+            ), False
+
+
+def _search_trip_pois_indexed(
+    origin: Dict[str, Any],
+    origin_lat: float,
+    origin_lon: float,
+    search_radius_m: int,
+    keyword: Optional[str],
+    type_filter: Optional[str],
+    language: Optional[str],
+) -> Dict[str, Any]:
+    """``_search_trip_pois`` served from the POI index when the area is already covered."""
+    tag = f"{keyword or ''}|{type_filter or ''}|{language or ''}"
+    items = _POI_INDEX.query(origin_lat, origin_lon, search_radius_m, tag)
+    if items is not None:
+        return {"items": items}
+    result, nearby = _search_trip_pois(origin, origin_lat, origin_lon, search_radius_m, keyword, type_filter, language)
+    # Only a plain nearby search is bounded by the circle, so only it can vouch for the area
+    _POI_INDEX.add(result.get("items") or [], origin_lat, origin_lon, search_radius_m, tag, covered=nearby)
+    return result
+
+
+def _location_cache_id(origin: Dict[str, Any], fallback: str) -> str:
+    """Stable cache identity for a resolved origin: its place_id, else normalized name."""
+    return origin.get("place_id") or f"q:{normalize_text(origin.get('name') or fallback)}"
+
+
+def _load_place_details(pid: str) -> Dict[str, Any]:
+    """One Place Details lookup, cached by the worker so results landing after the deadline are kept."""
+    try:
+        # Identical in-flight lookups from concurrent plans share one upstream call
+        details = _CACHE.flight.do(("details", pid), lambda: google_places.place_details_v1(pid))
+    except Exception:
+        # Remember the failure briefly; cached as {} so callers treat it as "no details"
+        _CACHE.set_negative("details", pid, {})
+        raise
+    if details:
+        _CACHE.set("details", pid, details)
+    return details
+
+
+def _fetch_place_details(place_ids: List[str], *, deadline_s: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+    """Fetch Place Details for many places concurrently, serving cached ones first.
+
+    Returns {place_id: details} for every lookup that was cached or succeeded
+    before the deadline; slow or failed lookups are left out (late ones are
+    still cached for the next plan).
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    unique_ids: List[str] = []
+    for pid in dict.fromkeys(pid for pid in place_ids if pid):
+        cached = _CACHE.get("details", pid)
+        if cached is not None:
+            results[pid] = cached
+        else:
+            unique_ids.append(pid)
+    if not unique_ids:
+        return results
+    deadline = _DETAILS_DEADLINE_SECONDS if deadline_s is None else deadline_s
+    futures = {_DETAILS_EXECUTOR.submit(_load_place_details, pid): pid for pid in unique_ids}
+    done, not_done = wait(futures, timeout=deadline)
+    # Don't block on stragglers: queued lookups are cancelled, running ones finish and cache themselves
+    for fut in not_done:
+        fut.cancel()
+
+    for fut in done:
+        try:
+            details = fut.result()
+        except Exception:
+            continue
+        if details:
+            results[futures[fut]] = details
+    return results
+
+
+def _edge_key(origin: Dict[str, Any], destination: Dict[str, Any]) -> str:
+    """Directed leg key: place_id pair when both are known, else coordinates rounded to ~10 m."""
+    def _end(item: Dict[str, Any]) -> str:
+        return item.get("place_id") or f"{float(item['lat']):.4f},{float(item['lon']):.4f}"
+
+    return f"{_end(origin)}>{_end(destination)}"
+
+
+def _fetch_leg_times(
+    pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]], *, city: Optional[str] = None
+) -> List[Optional[Dict[str, Any]]]:
+    """Distance Matrix elements for exactly these (origin, destination) place legs.
+
+    Legs are served from the "edge" cache in one batched lookup, then from
+    ``city``'s learned travel model when it is confident (those elements
+    carry ``estimated`` and ``error_seconds``). Only the rest are grouped
+    into requests that bill exactly the missing legs (1x1, or 1xN / Nx1 where
+    legs share an endpoint), run concurrently, cached and fed back into the
+    model. Returns one element per pair (same order); legs whose batch
+    failed, timed out or came back non-OK are None.
+    """
+    keys = [_edge_key(origin, destination) for origin, destination in pairs]
+    cached = _CACHE.get_many("edge", keys)
+    results: List[Optional[Dict[str, Any]]] = [cached.get(key) for key in keys]
+
+    # One upstream element per distinct missing leg
+    missing: Dict[str, List[int]] = {}
+    for idx, key in enumerate(keys):
+        if results[idx] is None:
+            missing.setdefault(key, []).append(idx)
+    if not missing:
+        return results
+    coord_pairs = []
+    for key in missing:
+        origin, destination = pairs[missing[key][0]]
+        coord_pairs.append(((origin["lat"], origin["lon"]), (destination["lat"], destination["lon"])))
+    straight_km = route_planner.haversine_pairs([o for o, _ in coord_pairs], [d for _, d in coord_pairs]).tolist()
+    if city:
+        remaining = []
+        for key, coords, km in zip(list(missing), coord_pairs, straight_km):
+            estimate = _TRAVEL_ESTIMATOR.estimate(city, km)
+            if estimate is None:
+                remaining.append((key, coords, km))
+                continue
+            for idx in missing.pop(key):
+                results[idx] = estimate
+        if not remaining:
+            return results
+        coord_pairs = [coords for _, coords, _ in remaining]
+        straight_km = [km for _, _, km in remaining]
+    missing_keys = list(missing)
+    futures = {
+        _DM_EXECUTOR.submit(
+            _load_leg_batch,
+            origins,
+            destinations,
+            [(missing_keys[pair_idx], straight_km[pair_idx], row, col) for pair_idx, row, col in cells],
+            city,
+        ): cells
+        for origins, destinations, cells in google_places.distance_matrix_batches(coord_pairs)
+    }
+    done, not_done = wait(futures, timeout=_DM_DEADLINE_SECONDS)
+    # Queued batches are cancelled; running ones finish and cache their legs for the next plan
+    for fut in not_done:
+        fut.cancel()
+
+    for fut in done:
+        try:
+            edges = fut.result()
+        except Exception:
+            continue
+        for key, edge in edges.items():
+            for idx in missing[key]:
+                results[idx] = edge
+    return results
+
+
+def _load_leg_batch(
+    origins: List[Tuple[float, float]],
+    destinations: List[Tuple[float, float]],
+    cells: List[Tuple[str, float, int, int]],
+    city: Optional[str],
+) -> Dict[str, Dict[str, Any]]:
+    """One Distance Matrix request; OK legs are cached and learned here, so late results are kept.
+
+    ``cells`` are (edge key, straight-line km, row, col); returns {edge key: element}.
+    """
+    rows = google_places.distance_matrix(origins, destinations).get("rows") or []
+    edges: Dict[str, Dict[str, Any]] = {}
+    observed = []
+    for key, km, row, col in cells:
+        try:
+            el = rows[row]["elements"][col]
+        except (IndexError, KeyError, TypeError):
+            continue
+        if el.get("status") != "OK":
+            continue
+        edge = {"distance_meters": el.get("distance_meters"), "duration_seconds": el.get("duration_seconds")}
+        _CACHE.set("edge", key, edge)
+        edges[key] = edge
+        observed.append((km, edge["distance_meters"], edge["duration_seconds"]))
+    if city and observed:
+        _TRAVEL_ESTIMATOR.observe_many(city, observed)
+    return edges
 
 
-def _chunk_days(items: List[Dict[str, Any]], no_of_days: int, per_day: int = 3) -> List[List[Dict[str, Any]]]:
-    total = min(len(items), no_of_days * per_day)
-    items = items[:total]
-    days: List[List[Dict[str, Any]]] = []
-    for i in range(0, total, per_day):
-        days.append(items[i : i + per_day])
-    return days
+def get_cache_stats() -> Dict[str, Any]:
+    """Size, eviction and hit/miss counters for the trip planning cache."""
+    stats = _CACHE.stats()
+    stats["geocode_keys"] = _GEOCODE_KEY_STATS.stats()
+    stats["travel_models"] = _TRAVEL_ESTIMATOR.stats()
+    stats["poi_index"] = _POI_INDEX.stats()
+    stats["gazetteer"] = get_gazetteer().stats()
+    return stats
 
 
 def get_stay_plan_suggestions(
@@ -302,16 +705,13 @@ def get_stay_plan_suggestions(
     budget_range = _determine_budget_category(budget)
     
     # Geocode location first
-    geo_key = f"geocode::{location}::{language or ''}::{region or ''}"
-    geo = _cache_get(geo_key)
-    if not geo:
-        geo = google_places.geocode(location, language=language, region=region)
-        _cache_set(geo_key, geo)
+    geo = _geocode_location(location, language, region)
     if not geo.get("items"):
         return []
     
     origin = geo["items"][0]
     origin_name = origin.get("name", location)
+    origin_cache_id = _location_cache_id(origin, location)
     
     # Define search queries based on budget category
     budget_queries = {
@@ -324,41 +724,32 @@ def get_stay_plan_suggestions(
     
     all_accommodations = []
     
+    # Fetch all search results first so hotel details can be enriched in one concurrent batch
+    stay_results: List[Tuple[str, Dict[str, Any]]] = []
     for query_term in queries:
-        stay_key = f"stay::{origin_name}::{query_term}::{language or ''}::v2"
-        stay_data = _cache_get(stay_key)
-        
-        if not stay_data:
-            try:
-                # Use text search for accommodations
-                full_query = f"{query_term} in {origin_name}"
-                stay_data = google_places.text_search_v1(
-                    query=full_query,
-                    language=language,
-                    region=region,
-                    limit=5
-                )
-            except Exception:
-                # Fallback to lodging search
-                try:
-                    stay_data = google_places.lodging_text_search_v1(
-                        origin_name, limit=5, language=language
-                    )
-                except Exception:
-                    stay_data = {"items": []}
-            _cache_set(stay_key, stay_data)
-        
+        stay_key = f"stay::{origin_cache_id}::{query_term}::{language or ''}::v3"
+        stay_data = _cache_get_or_load(
+            stay_key,
+            lambda query_term=query_term: _search_stays(query_term, origin_name, language, region),
+        )
+        stay_results.append((query_term, stay_data))
+
+    details_by_id = _fetch_place_details(
+        [
+            item.get("place_id")
+            for _, stay_data in stay_results
+            for item in stay_data.get("items", [])
+            if item.get("name") and item.get("lat") and item.get("lon")
+        ]
+    )
+
+    for query_term, stay_data in stay_results:
         # Process accommodations
         for hotel_index, item in enumerate(stay_data.get("items", [])):
             if item.get("name") and item.get("lat") and item.get("lon"):
-                # Get enhanced details if place_id available
+                # Use enhanced details if they came back in time
                 place_id = item.get("place_id")
-                enhanced_data = {}
-                if place_id:
-                    try:
-                        enhanced_data = google_places.place_details_v1(place_id)
-                    except Exception:
-                        pass
+                enhanced_data = details_by_id.get(place_id, {}) if place_id else {}
                 
                 # Calculate price range - use diverse pricing if no Google price level
                 price_level = item.get("price_level") or enhanced_data.get("raw_data", {}).get("priceLevel")
@@ -723,21 +1114,87 @@ def get_trip_plan_suggestions(
     """Generate a structured list of trip locations and stay options based on origin, days, trip type, and budget.
 
     Returns shape: { 
-        trip_plan: [ { day: N, locations: [ { name, description, lat, lng, photo_url, distance_from_previous } ] } ],
-        stay_plan: [ { name, location, address, rating, pricing, links, photos } ]
+        trip_plan: [ { day: N, locations: [ { name, description, lat, lng, photo_url, distance_from_previous, start_time, end_time } ] } ],
+        stay_plan: [ { name, location, address, rating, pricing, links, photos } ],
+        route_stats: { initial_km, final_km, saved_km, moves, budget_exhausted, cpu_ms }
     }
+
+    Finished plans are memoized in the "plan" cache namespace, keyed by the
+    resolved destination, day count, trip type and a ~10% budget bucket.
     """
     if not location or not isinstance(no_of_days_to_stay, int) or no_of_days_to_stay <= 0:
         return {"trip_plan": [], "stay_plan": []}
 
     # Geocode origin
-    geo_key = f"geocode::{location}::{language or ''}::{region or ''}"
-    geo = _cache_get(geo_key)
-    if not geo:
-        geo = google_places.geocode(location, language=language, region=region)
-        _cache_set(geo_key, geo)
+    geo = _geocode_location(location, language, region)
     if not geo.get("items"):
         return {"trip_plan": [], "stay_plan": []}
+
+    def _build() -> Dict[str, Any]:
+        return _build_trip_plan(
+            location=location,
+            geo=geo,
+            no_of_days_to_stay=no_of_days_to_stay,
+            trip_type=trip_type,
+            budget=budget,
+            language=language,
+            region=region,
+            search_radius_m=search_radius_m,
+        )
+
+    if _CACHE.ttl_for("plan") <= 0:
+        return _build()
+    plan_key = _plan_cache_key(
+        geo, location, no_of_days_to_stay, trip_type, budget, language, region, search_radius_m
+    )
+    plan = _CACHE.get_or_load("plan", plan_key, _build, is_negative=lambda p: not p.get("trip_plan"))
+    # Callers (e.g. the chat graph state) may mutate the result; never hand out the cached object
+    return copy.deepcopy(plan)
+
+
+def _budget_bucket(budget: Optional[float], currency: str) -> str:
+    """~10% wide geometric buckets, so nearby budgets share a memoized plan."""
+    if budget is None or budget <= 0:
+        return "none"
+    return f"{currency}:{round(math.log(budget, 1.1))}"
+
+
+def _plan_cache_key(
+    geo: Dict[str, Any],
+    location: str,
+    no_of_days_to_stay: int,
+    trip_type: str,
+    budget: Optional[float],
+    language: Optional[str],
+    region: Optional[str],
+    search_radius_m: int,
+) -> str:
+    origin = geo["items"][0]
+    canonical_type = trip_type if trip_type in TRIP_TYPE_TO_QUERY else "Leisure"
+    currency = _detect_currency_from_location(location, geo)
+    return (
+        f"{_location_cache_id(origin, location)}::{no_of_days_to_stay}::{canonical_type}::"
+        f"{_budget_bucket(budget, currency)}::{search_radius_m}::{language or ''}::{region or ''}::v1"
+    )
+
+
+def invalidate_trip_plans() -> None:
+    """Drop every memoized trip plan from all cache tiers (e.g. after a planner change)."""
+    _CACHE.clear("plan")
+
+
+def _build_trip_plan(
+    *,
+    location: str,
+    geo: Dict[str, Any],
+    no_of_days_to_stay: int,
+    trip_type: str,
+    budget: Optional[float],
+    language: Optional[str],
+    region: Optional[str],
+    search_radius_m: int,
+) -> Dict[str, Any]:
+    """The uncached planning pipeline behind ``get_trip_plan_suggestions``."""
     origin = geo["items"][0]
     origin_lat = float(origin["lat"])
     origin_lon = float(origin["lon"])
@@ -753,42 +1210,10 @@ def get_trip_plan_suggestions(
     type_filter = mapping.get("type")
 
     near_key = f"near::{origin_lat:.5f},{origin_lon:.5f}::{search_radius_m}::{keyword or ''}::{type_filter or ''}::{language or ''}::v2"
-    near = _cache_get(near_key)
-    if not near:
-        # Strategy: Use text search for keyword-based queries, nearby search for type-based queries
-        try:
-            if keyword and not type_filter:
-                # Use text search for keyword-based queries (more flexible)
-                location_name = origin.get("name", "unknown location")
-                query = f"{keyword.split(' OR ')[0]} near {location_name}"
-                near = google_places.text_search_v1(
-                    query=query,
-                    language=language,
-                    limit=20
-                )
-            else:
-                # Use nearby search for type-based queries
-                near = google_places.nearby_search_v1(
-                    lat=origin_lat,
-                    lon=origin_lon,
-                    radius=search_radius_m,
-                    included_type=type_filter,
-                    language=language,
-                )
-        except Exception:
-            # Fallback: legacy generalized nearby (best-effort), then attractions
-            try:
-                near = google_places.nearby_search(
-                    lat=origin_lat,
-                    lon=origin_lon,
-                    radius=search_radius_m,
-                    type_filter=type_filter,
-                    keyword=keyword,
-                    language=language,
-                )
-            except Exception:
-                near = google_places.nearby_attractions(lat=origin_lat, lon=origin_lon, radius=search_radius_m, language=language)
-        _cache_set(near_key, near)
+    near = _cache_get_or_load(
+        near_key,
+        lambda: _search_trip_pois_indexed(origin, origin_lat, origin_lon, search_radius_m, keyword, type_filter, language),
+    )
 
     items = []
     for it in (near.get("items") or []):
@@ -803,80 +1228,77 @@ def get_trip_plan_suggestions(
                 "types": it.get("types", []),
                 "rating": it.get("rating"),
             }
-            
-            # Try to get better description from Place Details API
-            if place_data["place_id"] and not place_data["description"]:
-                try:
-                    details = google_places.place_details_v1(place_data["place_id"])
-                    if details and details.get("description"):
-                        place_data["description"] = details["description"]
-                        # Update types and rating if available
-                        if details.get("types"):
-                            place_data["types"] = details["types"]
-                        if details.get("rating"):
-                            place_data["rating"] = details["rating"]
-                except Exception:
-                    # Place details API call failed, continue with existing data
-                    pass
-            
             items.append(place_data)
 
-    # Sequence by nearest-neighbor heuristic from origin
-    ordered = _sequence_by_nearest_neighbor(items, (origin_lat, origin_lon))
+    # One pairwise distance matrix per plan (index 0 = origin, i = items[i - 1]);
+    # day clustering, sequencing, packing and the fallback distance labels all read from it.
+    dist_km = route_planner.haversine_matrix(
+        [(origin_lat, origin_lon)] + [(it["lat"], it["lon"]) for it in items]
+    )
+    visit_minutes = {i + 1: _estimate_visit_duration(it.get("types", []), it["name"]) for i, it in enumerate(items)}
+    per_day = day_scheduler.max_stops_per_day(list(visit_minutes.values()))
+    day_paths, route_stats = route_planner.plan_days(
+        dist_km, no_of_days_to_stay, per_day, time_budget_s=_ROUTE_OPT_BUDGET_SECONDS
+    )
+    # Fill days by time rather than count. This is the final stop set: stops that do
+    # not fit are dropped here, before any Place Details or Distance Matrix lookups.
+    travel_estimate = day_scheduler.travel_minutes_matrix(dist_km)
+    day_paths = [day_scheduler.pack_day(day, visit_minutes, travel_estimate) for day in day_paths]
+    path = [i for day in day_paths for i in day]
+    ordered = [items[i - 1] for i in path]
 
-    # Compute distances and travel durations between consecutive spots
-    coords = [(o["lat"], o["lon"]) for o in ordered]
-    distances_km: List[Optional[float]] = [None] * len(ordered)
-    travel_durations_min: List[Optional[int]] = [None] * len(ordered)
-    
-    if len(coords) >= 2:
-        distance_matrix_success = False
-        try:
-            # Google Distance Matrix API has limits - try in smaller batches if needed
-            max_elements = 25  # Google allows up to 25 elements per request for free tier
-            if len(coords) - 1 <= max_elements:
-                dm = google_places.distance_matrix(coords[:-1], coords[1:])
-                rows = dm.get("rows") or []
-                if rows and len(rows) == len(coords) - 1:
-                    for i, row in enumerate(rows):
-                        el = (row.get("elements") or [{}])[0]
-                        meters = el.get("distance_meters")
-                        duration_seconds = el.get("duration_seconds")
-                        status = el.get("status")
-                        if status == "OK":
-                            if isinstance(meters, (int, float)):
-                                distances_km[i + 1] = round(meters / 1000.0, 1)
-                                distance_matrix_success = True
-                            if isinstance(duration_seconds, (int, float)):
-                                travel_durations_min[i + 1] = round(duration_seconds / 60.0)
-            else:
-                # Too many coordinates, skip Distance Matrix API
-                pass
-        except Exception:
-            # Distance Matrix API failed, will use fallback
-            pass
-        
-        # Always fall back to haversine for distance if Distance Matrix didn't work
-        if not distance_matrix_success:
-            for i in range(1, len(coords)):
-                dist = _haversine_km(coords[i - 1], coords[i])
-                distances_km[i] = round(dist, 1)
-                # Estimate travel duration based on distance (assume ~30 km/h average speed in cities)
-                travel_durations_min[i] = max(5, round(dist * 2))  # Minimum 5 min, ~2 min per km
-    
-    # Ensure first item is 0 for distance and travel time
-    if ordered:
-        distances_km[0] = 0.0
-        travel_durations_min[0] = 0
-
-    per_day = 3 if no_of_days_to_stay <= 3 else 2  # lighter pace for longer trips
-    day_chunks = _chunk_days(ordered, no_of_days_to_stay, per_day=per_day)
+    # Try to get better descriptions from Place Details API (concurrently, partial on deadline)
+    details_by_id = _fetch_place_details(
+        [item["place_id"] for item in ordered if item["place_id"] and not item["description"]]
+    )
+    for place_data in ordered:
+        details = details_by_id.get(place_data["place_id"]) if place_data["place_id"] else None
+        if details and details.get("description") and not place_data["description"]:
+            place_data["description"] = details["description"]
+            # Update types and rating if available
+            if details.get("types"):
+                place_data["types"] = details["types"]
+            if details.get("rating"):
+                place_data["rating"] = details["rating"]
+
+    day_chunks: List[List[int]] = []
+    for day in day_paths:
+        start = sum(len(c) for c in day_chunks)
+        day_chunks.append(list(range(start, start + len(day))))
+
+    # Distances and travel durations for the legs inside each day (first stop of a day is 0).
+    # Only those legs are requested from Distance Matrix; missing ones fall back to haversine.
+    distances_km: List[Optional[float]] = [0.0] * len(ordered)
+    travel_durations_min: List[Optional[int]] = [0] * len(ordered)
+    legs = [idx for day_positions in day_chunks for idx in day_positions[1:]]
+    leg_elements: List[Optional[Dict[str, Any]]] = []
+    try:
+        leg_elements = _fetch_leg_times(
+            [(ordered[idx - 1], ordered[idx]) for idx in legs], city=_location_cache_id(origin, location)
+        )
+    except Exception:
+        # Distance Matrix unavailable (e.g. no API key), use fallback for every leg
+        leg_elements = [None] * len(legs)
+    for idx, el in zip(legs, leg_elements):
+        meters = (el or {}).get("distance_meters")
+        duration_seconds = (el or {}).get("duration_seconds")
+        if isinstance(meters, (int, float)):
+            distances_km[idx] = round(meters / 1000.0, 1)
+        else:
+            distances_km[idx] = round(float(dist_km[path[idx - 1], path[idx]]), 1)
+        if isinstance(duration_seconds, (int, float)):
+            travel_durations_min[idx] = round(duration_seconds / 60.0)
+        else:
+            travel_durations_min[idx] = int(travel_estimate[path[idx - 1], path[idx]])
 
     trip_plan: List[Dict[str, Any]] = []
-    for day_idx, day_list in enumerate(day_chunks, start=1):
+    for day_idx, day_positions in enumerate(day_chunks, start=1):
+        # Packing is final: keep the visit estimates it used and only re-time with real leg durations
+        day_visits = [visit_minutes[path[idx]] for idx in day_positions]
+        day_times = day_scheduler.timeline(day_visits, [travel_durations_min[idx] for idx in day_positions])
         locs = []
-        for day_item_idx, item in enumerate(day_list):
-            idx = ordered.index(item)
+        for day_item_idx, idx in enumerate(day_positions):
+            item = ordered[idx]
             dist_val = distances_km[idx] if idx < len(distances_km) else None
             travel_duration = travel_durations_min[idx] if idx < len(travel_durations_min) else None
             
@@ -894,12 +1316,8 @@ def get_trip_plan_suggestions(
                 dist_str = "N/A"  # Fallback when distance calculation fails
                 travel_str = "N/A"
             
-            # Estimate visit duration based on place types and name
-            visit_duration_min = _estimate_visit_duration(
-                item.get("types", []), 
-                item["name"]
-            )
-            visit_duration_str = _format_duration(visit_duration_min)
+            visit_duration_str = _format_duration(day_visits[day_item_idx])
+            start_min, end_min = day_times[day_item_idx]
                 
             locs.append(
                 {
@@ -911,6 +1329,8 @@ def get_trip_plan_suggestions(
                     "distance_from_previous": dist_str,
                     "travel_duration": travel_str,
                     "estimated_visit_duration": visit_duration_str,
+                    "start_time": day_scheduler.format_clock(start_min),
+                    "end_time": day_scheduler.format_clock(end_min),
                     "rating": item.get("rating"),
                     "types": item.get("types", []),
                 }
@@ -933,4 +1353,4 @@ def get_trip_plan_suggestions(
             # If stay plan generation fails, continue with empty stay plan
             pass
 
-    return {"trip_plan": trip_plan, "stay_plan": stay_plan}
+    return {"trip_plan": trip_plan, "stay_plan": stay_plan, "route_stats": route_stats}
@@ -0,0 +1,95 @@
+"""Compare the old scalar nearest-neighbour sequencing with the NumPy matrix path,
+and time day clustering (balanced k-medoids + per-day routing) on the same sets.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_route_planner [--sizes 20,50,100,200,500] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.services import route_planner
+
+
+def _haversine_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    lat1, lon1 = math.radians(a[0]), math.radians(a[1])
+    lat2, lon2 = math.radians(b[0]), math.radians(b[1])
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(h))
+
+
+def scalar_plan(points: List[Dict[str, Any]], start: Tuple[float, float]) -> List[float]:
+    """The previous planner: min()/lambda NN, pairwise recompute, ordered.index()."""
+    remaining = points[:]
+    ordered: List[Dict[str, Any]] = []
+    current = start
+    while remaining:
+        nearest_idx = min(
+            range(len(remaining)),
+            key=lambda i: _haversine_km(current, (remaining[i]["lat"], remaining[i]["lon"])),
+        )
+        next_point = remaining.pop(nearest_idx)
+        ordered.append(next_point)
+        current = (next_point["lat"], next_point["lon"])
+    coords = [(o["lat"], o["lon"]) for o in ordered]
+    distances = [0.0] + [_haversine_km(coords[i - 1], coords[i]) for i in range(1, len(coords))]
+    return [distances[ordered.index(item)] for item in ordered]
+
+
+def matrix_plan(points: List[Dict[str, Any]], start: Tuple[float, float]) -> List[float]:
+    """The current planner: one matrix, masked-argmin NN, lookups by index."""
+    dist = route_planner.haversine_matrix([start] + [(p["lat"], p["lon"]) for p in points])
+    path = route_planner.nearest_neighbor_order(dist, start=0)[1:]
+    return [0.0] + [float(dist[path[i - 1], path[i]]) for i in range(1, len(path))]
+
+
+def _points(n: int, rng: random.Random) -> List[Dict[str, Any]]:
+    # Roughly a 30 km box around central Goa
+    return [{"lat": 15.5 + rng.uniform(-0.15, 0.15), "lon": 73.8 + rng.uniform(-0.15, 0.15)} for _ in range(n)]
+
+
+def _best_of(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="20,50,100,200,500")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = (15.5, 73.8)
+    print(f"{'n':>6} {'scalar ms':>12} {'matrix ms':>12} {'speedup':>9}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        points = _points(n, rng)
+        # Both paths must produce the same tour
+        assert all(abs(a - b) < 1e-6 for a, b in zip(scalar_plan(points, start), matrix_plan(points, start)))
+        scalar = _best_of(lambda: scalar_plan(points, start), args.repeat)
+        matrix = _best_of(lambda: matrix_plan(points, start), args.repeat)
+        print(f"{n:>6} {scalar * 1000:>12.2f} {matrix * 1000:>12.2f} {scalar / matrix:>8.1f}x")
+
+    print()
+    print(f"{'n':>6} {'days':>5} {'per day':>8} {'plan_days ms':>13}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        points = _points(n, rng)
+        dist = route_planner.haversine_matrix([start] + [(p["lat"], p["lon"]) for p in points])
+        n_days = max(1, n // 10)
+        elapsed = _best_of(lambda: route_planner.plan_days(dist, n_days, 10, time_budget_s=0), args.repeat)
+        print(f"{n:>6} {n_days:>5} {10:>8} {elapsed * 1000:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
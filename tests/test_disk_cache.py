@@ -0,0 +1,65 @@
+import threading
+import time
+
+from app.services.disk_cache import DiskCacheBackend
+
+
+def _on_disk_bytes(cache):
+    return cache._connection().execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+
+def test_running_total_tracks_writes_overwrites_and_deletes(tmp_path):
+    cache = DiskCacheBackend(str(tmp_path / "cache.sqlite"))
+    later = time.time() + 60
+    cache.set("ns", "a", "x" * 10, later)
+    cache.set("ns", "b", "y" * 20, later)
+    cache.flush()
+    cache.set("ns", "a", "z" * 30, later)
+    cache.delete("ns", "b")
+    cache.flush()
+    assert cache.get("ns", "a") == ("z" * 30, later)
+    assert cache.get("ns", "b") is None
+    assert cache.stats()["bytes"] == _on_disk_bytes(cache)
+
+
+def test_size_cap_drops_oldest_entries(tmp_path):
+    cache = DiskCacheBackend(str(tmp_path / "cache.sqlite"), max_bytes=100)
+    later = time.time() + 60
+    for i in range(10):
+        cache.set("ns", f"k{i}", "v" * 20, later)
+        cache.flush()
+    assert cache.stats()["bytes"] <= 100
+    assert cache.stats()["bytes"] == _on_disk_bytes(cache)
+    assert cache.get("ns", "k0") is None
+    assert cache.get("ns", "k9") is not None
+
+
+def test_clear_namespace_keeps_total_and_other_namespaces(tmp_path):
+    cache = DiskCacheBackend(str(tmp_path / "cache.sqlite"))
+    later = time.time() + 60
+    cache.set("one", "a", "x" * 10, later)
+    cache.set("two", "a", "x" * 10, later)
+    cache.clear("one")
+    assert cache.get("one", "a") is None
+    assert cache.get("two", "a") is not None
+    assert cache.stats()["bytes"] == _on_disk_bytes(cache)
+
+
+def test_concurrent_flushes_keep_the_newest_value(tmp_path):
+    cache = DiskCacheBackend(str(tmp_path / "cache.sqlite"))
+    later = time.time() + 60
+
+    def writer(n):
+        for i in range(50):
+            cache.set("ns", "k", f"{n}-{i}", later)
+            cache.flush()
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    cache.set("ns", "k", "final", later)
+    cache.flush()
+    assert cache.get("ns", "k") == ("final", later)
+    assert cache.stats()["bytes"] == _on_disk_bytes(cache)
@@ -0,0 +1,44 @@
+import pytest
+
+pytest.importorskip("requests")
+
+from app.services.google_places import DM_MAX_ELEMENTS, distance_matrix_batches  # noqa: E402
+
+
+def _chain(n):
+    stops = [(float(i), float(i)) for i in range(n)]
+    return list(zip(stops, stops[1:]))
+
+
+def _picked(batches, pairs):
+    found = {}
+    for origins, destinations, cells in batches:
+        for idx, row, col in cells:
+            found[idx] = (origins[row], destinations[col])
+    return [found[i] for i in range(len(pairs))]
+
+
+def _billed(batches):
+    return sum(len(origins) * len(destinations) for origins, destinations, _ in batches)
+
+
+def test_chain_bills_only_its_legs():
+    pairs = _chain(25)
+    batches = distance_matrix_batches(pairs)
+    assert _billed(batches) == len(set(pairs)) == 24
+    assert all(len(o) * len(d) <= DM_MAX_ELEMENTS for o, d, _ in batches)
+    assert _picked(batches, pairs) == pairs
+
+
+def test_shared_endpoints_are_grouped_within_limits():
+    hub = (0.0, 0.0)
+    pairs = [(hub, (float(i), 1.0)) for i in range(1, 61)] + [((float(i), 2.0), hub) for i in range(1, 31)]
+    batches = distance_matrix_batches(pairs)
+    assert _billed(batches) == len(pairs)
+    assert all(len(o) * len(d) <= DM_MAX_ELEMENTS for o, d, _ in batches)
+    assert len(batches) == 5
+    assert _picked(batches, pairs) == pairs
+
+
+def test_empty():
+    assert distance_matrix_batches([]) == []
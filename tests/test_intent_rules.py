@@ -0,0 +1,53 @@
+import pytest
+
+from app.chatbot.intent_rules import classify_intent, rule_intent
+
+THRESHOLD = 0.8
+
+
+def decided(query, collecting=False):
+    label, confidence = classify_intent(query, collecting=collecting)
+    return label if confidence >= THRESHOLD else None
+
+
+@pytest.mark.parametrize("query", ["hi", "thanks so much!", "how are you", "ok thanks"])
+def test_small_talk(query):
+    assert decided(query) == "small_talk"
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["plan a 5 day trip to Goa", "3 days in Jaipur in December", "weekend getaway to Manali"],
+)
+def test_trip_planning(query):
+    assert decided(query) == "trip_planning"
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "maybe we could plan dinner",
+        "I decided to visit my mom",
+        "the market stay was fun",
+        "Thanks for the plan, I'll stay tuned",
+        "you may visit whenever",
+    ],
+)
+def test_generic_words_go_to_the_model(query):
+    assert decided(query) is None
+
+
+@pytest.mark.parametrize("query", ["ok", "okay", "great", "cool", "nice"])
+def test_acknowledgements_while_collecting_go_to_the_model(query):
+    assert decided(query) == "small_talk"
+    assert classify_intent(query, collecting=True) == (None, 0.0)
+
+
+def test_bare_answer_while_collecting():
+    assert decided("3 days", collecting=True) == "trip_planning"
+
+
+def test_rule_intent_reads_collecting_from_state():
+    state = {"query": "ok", "preferences": {"location": "Goa"}, "missing_fields": ["num_days"]}
+    assert rule_intent(state, THRESHOLD) is None
+    assert rule_intent({"query": "ok"}, THRESHOLD) == "small_talk"
@@ -0,0 +1,30 @@
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("pymongo")
+
+from app.services import trip_suggestions  # noqa: E402
+from app.services.cache import LRUCache  # noqa: E402
+
+
+def test_details_landing_after_the_deadline_are_cached(monkeypatch):
+    calls = []
+
+    def place_details_v1(pid):
+        calls.append(pid)
+        if pid == "slow":
+            time.sleep(0.2)
+        return {"description": f"about {pid}"}
+
+    monkeypatch.setattr(trip_suggestions.google_places, "place_details_v1", place_details_v1)
+    monkeypatch.setattr(trip_suggestions, "_CACHE", LRUCache())
+
+    found = trip_suggestions._fetch_place_details(["fast", "slow"], deadline_s=0.05)
+    assert set(found) == {"fast"}
+
+    time.sleep(0.3)
+    again = trip_suggestions._fetch_place_details(["fast", "slow"], deadline_s=0.05)
+    assert set(again) == {"fast", "slow"}
+    assert sorted(calls) == ["fast", "slow"]
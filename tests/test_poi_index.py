@@ -0,0 +1,31 @@
+from app.services.poi_index import POIIndex
+
+
+def _items(n, lat=15.5, lon=73.8, prefix="p"):
+    return [
+        {"place_id": f"{prefix}{i}", "lat": lat + i * 0.001, "lon": lon, "rating": float(i % 5)}
+        for i in range(n)
+    ]
+
+
+def test_query_keeps_upstream_order():
+    index = POIIndex(min_results=1)
+    items = _items(8)
+    index.add(items, 15.5, 73.8, 5000, "tag")
+    found = index.query(15.5, 73.8, 4000, "tag")
+    assert [f["place_id"] for f in found] == [i["place_id"] for i in items]
+
+
+def test_results_without_coverage_are_not_served():
+    index = POIIndex(min_results=1)
+    index.add(_items(8), 15.5, 73.8, 5000, "beach|", covered=False)
+    assert index.query(15.5, 73.8, 4000, "beach|") is None
+
+
+def test_moving_a_place_drops_its_empty_cell():
+    index = POIIndex(min_results=1)
+    index.add([{"place_id": "a", "lat": 10.0, "lon": 10.0}], 10.0, 10.0, 1000, "tag")
+    index.add([{"place_id": "a", "lat": 20.0, "lon": 20.0}], 20.0, 20.0, 1000, "tag")
+    stats = index.stats()
+    assert stats["points"] == 1
+    assert stats["cells"] == 1
@@ -0,0 +1,32 @@
+from app.chatbot.nodes.preference import preference_node
+
+
+class FakeLLM:
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return self.response
+
+
+def test_rules_alone_skip_the_model():
+    llm = FakeLLM("{}")
+    state = preference_node({"query": "5 days", "preferences": {"location": "Goa"}}, llm)
+    assert state["preferences"] == {"location": "Goa", "num_days": 5}
+    assert llm.calls == 0
+
+
+def test_model_wins_when_rules_do_not_explain_the_message():
+    llm = FakeLLM('{"location": "Goa", "num_days": 3}')
+    state = preference_node({"query": "I don't want 5 days, make it 3 days", "preferences": {"location": "Goa"}}, llm)
+    assert state["preferences"]["num_days"] == 3
+    assert llm.calls == 1
+
+
+def test_flexible_budget_goes_to_the_model():
+    llm = FakeLLM('{"location": "Goa", "budget": "flexible"}')
+    state = preference_node({"query": "my budget is flexible", "preferences": {"location": "Goa"}}, llm)
+    assert "trip_start_day" not in state["preferences"]
+    assert llm.calls == 1
@@ -0,0 +1,79 @@
+from datetime import date
+
+import pytest
+
+from app.chatbot.preference_rules import extract_preferences
+
+
+TODAY = date(2026, 10, 18)
+
+
+def extract(query, missing=None):
+    return extract_preferences(query, missing, today=TODAY)
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("5 days", {"num_days": 5}),
+        ("budget ₹30000", {"budget": "INR 30000"}),
+        ("around 30k INR", {"budget": "INR 30000"}),
+        ("Rs. 25,000", {"budget": "INR 25000"}),
+        ("2026-12-05", {"trip_start_day": "2026-12-05"}),
+        ("15th March", {"trip_start_day": "2027-03-15"}),
+        ("starting may 5th", {"trip_start_day": "2027-05-05"}),
+        ("on may 5", {"trip_start_day": "2027-05-05"}),
+        ("next friday", {"trip_start_day": "2026-10-23"}),
+        ("flexible dates", {"trip_start_day": "flexible"}),
+        ("my dates are flexible", {"trip_start_day": "flexible"}),
+        ("adventure and cultural", {"trip_type": ["Adventure", "Cultural"]}),
+        ("a week in Jaipur", {"location": "Jaipur", "num_days": 7}),
+    ],
+)
+def test_fully_explained(query, expected):
+    assert extract(query) == (expected, True)
+
+
+def test_may_as_a_verb_is_not_a_date():
+    prefs, explained = extract("may 5 people join?")
+    assert "trip_start_day" not in prefs
+    assert not explained
+
+
+def test_may_before_a_duration_is_not_a_date():
+    prefs, explained = extract("I may do 5 days")
+    assert prefs == {"num_days": 5}
+    assert not explained
+
+
+def test_corrected_duration_takes_the_last_one():
+    prefs, explained = extract("I don't want 5 days, make it 3 days")
+    assert prefs["num_days"] == 3
+    assert not explained
+
+
+def test_flexible_budget_is_not_a_start_date():
+    prefs, explained = extract("my budget is flexible")
+    assert "trip_start_day" not in prefs
+    assert not explained
+
+
+def test_bare_flexible_answers_open_start_date():
+    assert extract("flexible", ["trip_start_day"]) == ({"trip_start_day": "flexible"}, True)
+    assert extract("flexible", ["trip_start_day", "budget"]) == ({}, False)
+
+
+def test_bare_number_answers_open_num_days():
+    assert extract("5", ["num_days"]) == ({"num_days": 5}, True)
+    assert extract("5", ["num_days", "budget"]) == ({}, False)
+
+
+def test_departure_city_is_not_the_destination():
+    prefs, _ = extract("from Mumbai")
+    assert "location" not in prefs
+
+
+@pytest.mark.parametrize("query", ["budget 500 per person", "budget INR 20000 for 4 people"])
+def test_per_person_budget_goes_to_the_model(query):
+    _, explained = extract(query)
+    assert not explained
@@ -0,0 +1,56 @@
+import threading
+
+from app.services.cache import CacheBackend, LRUCache
+from app.services.travel_estimator import TravelEstimator
+
+
+class SharedBackend(CacheBackend):
+    """In-memory stand-in for a shared tier with atomic increments."""
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def get(self, namespace, key):
+        return self.data.get((namespace, key))
+
+    def set(self, namespace, key, value, expires_at):
+        self.data[(namespace, key)] = (value, expires_at)
+
+    def increment(self, namespace, key, deltas, expires_at):
+        with self.lock:
+            value, _ = self.data.get((namespace, key), ({}, expires_at))
+            totals = {f: value.get(f, 0.0) + deltas.get(f, 0.0) for f in set(value) | set(deltas)}
+            self.data[(namespace, key)] = (totals, expires_at)
+            return dict(totals)
+
+
+def _legs(n):
+    return [(km, km * 1300, (4 + km * 3) * 60) for km in range(1, n + 1)]
+
+
+def test_instances_sharing_a_backend_keep_every_observation():
+    shared = SharedBackend()
+    first = TravelEstimator(LRUCache(backends=[shared]), min_samples=3)
+    second = TravelEstimator(LRUCache(backends=[shared]), min_samples=3)
+    first.observe_many("goa", _legs(5))
+    second.observe_many("goa", _legs(4))
+    value, _ = shared.get("travel_model", "goa")
+    assert value["n"] == 9
+
+
+def test_model_is_reloaded_after_the_interval():
+    shared = SharedBackend()
+    reader = TravelEstimator(LRUCache(backends=[shared]), min_samples=3, reload_interval=0)
+    writer = TravelEstimator(LRUCache(backends=[shared]), min_samples=3)
+    assert reader.estimate("goa", 5.0) is None
+    writer.observe_many("goa", _legs(6))
+    estimate = reader.estimate("goa", 5.0)
+    assert estimate is not None and estimate["estimated"]
+
+
+def test_local_increment_without_backends():
+    estimator = TravelEstimator(LRUCache(), min_samples=3)
+    estimator.observe_many("goa", _legs(2))
+    estimator.observe_many("goa", _legs(2))
+    assert estimator.stats()["cities"]["goa"]["samples"] == 4
@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("pymongo")
+
+from app.services import trip_suggestions  # noqa: E402
+from app.services.poi_index import POIIndex  # noqa: E402
+
+
+def test_second_indexed_search_makes_no_upstream_request(monkeypatch):
+    calls = []
+
+    def nearby_search_v1(*, lat, lon, radius, included_type=None, language=None):
+        calls.append((lat, lon, radius))
+        return {
+            "items": [
+                {"place_id": f"p{i}", "name": f"Place {i}", "lat": lat + i * 0.001, "lon": lon, "types": []}
+                for i in range(10)
+            ]
+        }
+
+    monkeypatch.setattr(trip_suggestions.google_places, "nearby_search_v1", nearby_search_v1)
+    monkeypatch.setattr(trip_suggestions, "_POI_INDEX", POIIndex())
+    origin = {"name": "Panaji"}
+    args = ("beach OR coast", "tourist_attraction", None)
+
+    first = trip_suggestions._search_trip_pois_indexed(origin, 15.49, 73.82, 5000, *args)
+    second = trip_suggestions._search_trip_pois_indexed(origin, 15.4901, 73.8201, 4000, *args)
+
+    assert len(calls) == 1
+    assert [i["place_id"] for i in second["items"]] == [i["place_id"] for i in first["items"]]
@@ -249,6 +249,7 @@ const FinalTripPlannerPage = () => {
     
     startAssistantTyping();
     let firstAssistantChunk = true;
+    let streamedText = "";
     const isFirstUserMessage = !initialProcessedRef.current;
     
     try {
@@ -259,6 +260,22 @@ const FinalTripPlannerPage = () => {
       await streamChat({
         streamUrl,
         onEvent: (evt) => {
+          if (evt.event === "delta" && evt.role === "assistant") {
+            // Render partial text as tokens arrive; the final "message" event replaces it
+            streamedText += evt.content || "";
+            if (!streamedText) return;
+            if (firstAssistantChunk) {
+              const replaceInitial = isFirstUserMessage && !initialProcessedRef.current;
+              addMessage({ text: streamedText, sender: 'assistant' }, replaceInitial);
+              if (isFirstUserMessage) {
+                initialProcessedRef.current = true;
+              }
+              firstAssistantChunk = false;
+            } else {
+              setLastAssistantMessage(streamedText);
+            }
+            return;
+          }
           if (evt.event === "message" && evt.role === "assistant") {
             const content = evt.content || "";
             if (!content) return;